@@ -0,0 +1,441 @@
+import heapq
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from aligner.core import (
+    QueryProfile,
+    alignment_result,
+    build_direction_matrix,
+    traceback,
+)
+from aligner.models import Sequence
+from aligner.scoring import SubstitutionMatrix
+
+Pair = Tuple[Sequence, Sequence]
+
+# Fields of a summary row that describe the alignment itself.
+SUMMARY_STATS = ("score", "length", "matches", "identity_pct", "gaps")
+
+
+def cross_pairs(
+    records1: Iterable[Sequence], records2: List[Sequence]
+) -> Iterator[Pair]:
+    """
+    Yield every record of records1 paired with every record of records2.
+    records1 is consumed lazily, so it may be a streaming reader.
+    """
+    for rec1 in records1:
+        for rec2 in records2:
+            yield rec1, rec2
+
+
+def read_pairs(
+    path: str, records1: List[Sequence], records2: List[Sequence]
+) -> List[Pair]:
+    """
+    Read an explicit pairs list: one "ID1 ID2" line per pair, where ID1 names
+    a record of records1 and ID2 a record of records2. Blank lines and lines
+    starting with '#' are skipped.
+    Parameters
+    ----------
+    path : str
+        Path to the pairs file.
+    records1, records2 : list[Sequence]
+        Records the identifiers are looked up in.
+    Returns
+    -------
+    list[tuple[Sequence, Sequence]]
+        The requested pairs, in file order.
+    Raises
+    ------
+    ValueError
+        If a line is malformed or names an unknown record.
+    """
+    by_id1 = {rec.id: rec for rec in records1}
+    by_id2 = {rec.id: rec for rec in records2}
+    pairs = []
+    with open(path) as f:
+        for lineno, raw in enumerate(f, start=1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split()
+            if len(fields) != 2:
+                raise ValueError(f"{path}:{lineno}: expected two record IDs")
+            id1, id2 = fields
+            if id1 not in by_id1 or id2 not in by_id2:
+                raise ValueError(f"{path}:{lineno}: unknown record {line!r}")
+            pairs.append((by_id1[id1], by_id2[id2]))
+    return pairs
+
+
+def align_summary(
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+    min_score: Optional[int] = None,
+) -> Dict:
+    """
+    Align one pair and return its summary row: IDs, score and the statistics
+    of one optimal alignment.
+
+    With min_score the direction fill stops as soon as the cutoff can no
+    longer be reached (see build_direction_matrix); such a pair is not
+    aligned and gets a row with "rejected" set and None statistics. Rows
+    of accepted pairs then carry "rejected": False.
+    """
+    directions = build_direction_matrix(
+        seq1, seq2, match, mismatch, gap, substitution, min_score
+    )
+    if directions is None:
+        row = {"id1": seq1.id, "id2": seq2.id}
+        row.update(dict.fromkeys(SUMMARY_STATS), rejected=True)
+        return row
+    aln1, aln2 = traceback(None, seq1, seq2, match, mismatch, gap, directions)
+    result = alignment_result(aln1, aln2, match, mismatch, gap, substitution)
+    row = {
+        "id1": seq1.id,
+        "id2": seq2.id,
+        "score": result.score,
+        "length": result.length,
+        "matches": result.matches,
+        "identity_pct": result.identity_pct,
+        "gaps": result.gaps,
+    }
+    if min_score is not None:
+        row["rejected"] = False
+    return row
+
+
+def _align_chunk(
+    chunk: List[Pair],
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+    min_score: Optional[int] = None,
+) -> List:
+    return [
+        align_summary(s1, s2, match, mismatch, gap, substitution, min_score)
+        for s1, s2 in chunk
+    ]
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ordered_map(
+    executor: Executor,
+    fn: Callable,
+    items: Iterable,
+    window: int,
+    *args,
+) -> Iterator:
+    """
+    Like Executor.map, but keeps at most window tasks in flight, so items
+    is consumed (and results are yielded, in order) as the pool progresses
+    instead of being submitted all at once.
+    """
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def run_batch(
+    pairs: Iterable[Pair],
+    match: int,
+    mismatch: int,
+    gap: int,
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+    substitution: Optional[SubstitutionMatrix] = None,
+    min_score: Optional[int] = None,
+) -> Iterator[Dict]:
+    """
+    Align many pairs across a process pool and stream their summary rows.
+
+    Pairs are shipped to the workers in chunks to amortise inter-process
+    overhead; rows come back in input order as soon as they are ready.
+    Parameters
+    ----------
+    pairs : Iterable[tuple[Sequence, Sequence]]
+        Pairs to align; consumed lazily.
+    match, mismatch, gap : int
+        Scoring parameters.
+    workers : int, optional
+        Number of worker processes (default: one per CPU). With 1 the pairs
+        are aligned in the current process.
+    chunksize : int
+        Number of pairs per task.
+    substitution : SubstitutionMatrix, optional
+        Substitution matrix scoring aligned pairs in place of match/mismatch.
+    min_score : int, optional
+        Cutoff below which pairs are rejected without being aligned.
+    Returns
+    -------
+    Iterator[dict]
+        One summary row per pair, see align_summary.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(pairs, chunksize)
+    if workers == 1:
+        for chunk in chunks:
+            yield from _align_chunk(
+                chunk, match, mismatch, gap, substitution, min_score
+            )
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = ordered_map(
+            executor,
+            _align_chunk,
+            chunks,
+            4 * workers,
+            match,
+            mismatch,
+            gap,
+            substitution,
+            min_score,
+        )
+        for rows in results:
+            yield from rows
+
+
+def _score_chunk(
+    chunk: List[Sequence],
+    query: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> List[int]:
+    profile = QueryProfile(query, match, mismatch, gap, substitution)
+    return profile.score_many(chunk)
+
+
+def search(
+    query: Sequence,
+    database: Iterable[Sequence],
+    match: int,
+    mismatch: int,
+    gap: int,
+    top: int = 10,
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> List[Dict]:
+    """
+    Score a query against every record of a database and align the best.
+
+    Records are scored a chunk at a time with a QueryProfile (linear memory,
+    no traceback) across a process pool while the database is streamed;
+    only a bounded heap of the top best-scoring records is kept, so memory
+    does not grow with the database. The winners alone are then aligned in
+    full.
+    Parameters
+    ----------
+    query : Sequence
+        The query sequence (aligned as seq1).
+    database : Iterable[Sequence]
+        Target records; consumed lazily, e.g. from aligner.io.iter_fasta.
+    match, mismatch, gap : int
+        Scoring parameters.
+    top : int
+        Number of best-scoring records to report.
+    workers : int, optional
+        Number of worker processes (default: one per CPU). With 1 the
+        records are scored in the current process.
+    chunksize : int
+        Number of records per task.
+    substitution : SubstitutionMatrix, optional
+        Substitution matrix scoring aligned pairs in place of match/mismatch.
+    Returns
+    -------
+    list[dict]
+        Summary rows (see align_summary) of the winners, best first; equal
+        scores keep database order.
+    """
+    if top < 1:
+        return []
+    workers = workers or os.cpu_count() or 1
+    in_flight: deque = deque()
+
+    def tracked(chunks: Iterator[List[Sequence]]) -> Iterator[List[Sequence]]:
+        # results come back in submission order, so the oldest chunk still
+        # in flight is the one each result belongs to
+        for chunk in chunks:
+            in_flight.append(chunk)
+            yield chunk
+
+    chunks = tracked(_chunks(database, chunksize))
+    params = (query, match, mismatch, gap, substitution)
+    heap: List[Tuple[int, int, Sequence]] = []
+    order = 0
+
+    def offer(scores: List[int]) -> None:
+        nonlocal order
+        for score, target in zip(scores, in_flight.popleft()):
+            # a min-heap on (score, -order) drops the lowest score, and the
+            # latest record among equal scores, first
+            entry = (score, -order, target)
+            order += 1
+            if len(heap) < top:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    if workers == 1:
+        for chunk in chunks:
+            offer(_score_chunk(chunk, *params))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for scores in ordered_map(
+                executor, _score_chunk, chunks, 4 * workers, *params
+            ):
+                offer(scores)
+    winners = sorted(heap, key=lambda entry: entry[:2], reverse=True)
+    return [
+        align_summary(query, target, match, mismatch, gap, substitution)
+        for _, _, target in winners
+    ]
+
+
+# Per-worker state for all_vs_all, set up once by _attach_results.
+_worker: Dict = {}
+
+
+def _attach_results(
+    name: str,
+    records: List[Sequence],
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> None:
+    # Workers share the parent's resource tracker, so attaching here does
+    # not hand ownership over; the parent unlinks the block when done.
+    shm = shared_memory.SharedMemory(name=name)
+    n = len(records)
+    _worker.update(
+        shm=shm,
+        results=np.ndarray((2, n, n), dtype=np.float64, buffer=shm.buf),
+        records=records,
+        params=(match, mismatch, gap, substitution),
+    )
+
+
+def _fill_cells(cells: List[Tuple[int, int]]) -> int:
+    results = _worker["results"]
+    records = _worker["records"]
+    _fill_result_cells(results, records, cells, *_worker["params"])
+    return len(cells)
+
+
+def _upper_cells(n: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the (i, j) cells of the upper triangle of an n x n matrix,
+    diagonal included, without materialising them.
+    """
+    for i in range(n):
+        for j in range(i, n):
+            yield i, j
+
+
+def _fill_result_cells(
+    results: np.ndarray,
+    records: List[Sequence],
+    cells: Iterable[Tuple[int, int]],
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> None:
+    for i, j in cells:
+        row = align_summary(records[i], records[j], match, mismatch, gap, substitution)
+        results[0, i, j] = results[0, j, i] = row["score"]
+        results[1, i, j] = results[1, j, i] = row["identity_pct"]
+
+
+def identity_distances(identity: np.ndarray) -> np.ndarray:
+    """
+    Turn a percentage identity matrix into distances in [0, 1].
+    """
+    return 1.0 - identity / 100.0
+
+
+def all_vs_all(
+    records: List[Sequence],
+    match: int,
+    mismatch: int,
+    gap: int,
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Align every pair of records once and return symmetric N x N matrices.
+
+    Only the upper triangle (including the diagonal) is aligned. Workers
+    receive the records once at start-up and write each result, mirrored,
+    straight into a shared-memory array, so nothing but cell indices
+    travels between processes.
+    Parameters
+    ----------
+    records : list[Sequence]
+        Records to compare, e.g. all records of one multi-FASTA.
+    match, mismatch, gap : int
+        Scoring parameters.
+    workers : int, optional
+        Number of worker processes (default: one per CPU). With 1 the work
+        is done in the current process.
+    chunksize : int
+        Number of cells per task.
+    substitution : SubstitutionMatrix, optional
+        Substitution matrix scoring aligned pairs in place of match/mismatch.
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The score matrix and the percentage identity matrix.
+    """
+    n = len(records)
+    cells = _upper_cells(n)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n < 2:
+        results = np.zeros((2, n, n), dtype=np.float64)
+        _fill_result_cells(results, records, cells, match, mismatch, gap, substitution)
+        return results[0], results[1]
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 2 * n * n * 8))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach_results,
+            initargs=(shm.name, records, match, mismatch, gap, substitution),
+        ) as executor:
+            # a bounded window keeps the queued chunks (and the cell tuples
+            # behind them) constant however many records there are
+            for _ in ordered_map(
+                executor, _fill_cells, _chunks(cells, chunksize), 4 * workers
+            ):
+                pass
+        results = np.ndarray((2, n, n), dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return results[0], results[1]
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Optional
+import numpy as np
+from aligner.models import Sequence
+from aligner.scoring import SubstitutionMatrix
+
+# Default size bound of a cache directory, in bytes.
+DEFAULT_CACHE_BYTES = 1 << 30
+
+_SUFFIX = ".npz"
+
+
+class AlignmentCache:
+    """
+    A content-addressed on-disk cache of alignment results.
+
+    Each entry is one .npz file named by the SHA-256 of the sequence bytes,
+    alphabet and every parameter that shapes the result. It holds a JSON
+    record (score, alignment) and, optionally, the score matrix or the
+    direction matrix. The directory is kept under max_bytes by evicting the
+    least recently used entries; hits refresh an entry's modification time.
+    Attributes
+    ----------
+    directory : str
+        Where the entries are stored; created on demand.
+    max_bytes : int
+        Upper bound on the total size of the entries.
+    Methods
+    -------
+    key
+        Hash the inputs of an alignment into an entry name.
+    get
+        Load an entry, or return None on a miss.
+    put
+        Store an entry and evict old ones beyond max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(
+        seq1: Sequence,
+        seq2: Sequence,
+        substitution: Optional[SubstitutionMatrix] = None,
+        **params,
+    ) -> str:
+        """
+        Return the hex digest identifying an alignment of seq1 and seq2 with
+        the given scoring and mode parameters (all passed as keywords).
+        """
+        digest = hashlib.sha256()
+        for seq in (seq1, seq2):
+            # length prefixes keep ("AC", "GT") apart from ("ACG", "T")
+            digest.update(len(seq).to_bytes(8, "little"))
+            digest.update(seq.data)
+        fields = dict(params, alphabets=[seq1.alphabet, seq2.alphabet])
+        digest.update(json.dumps(fields, sort_keys=True).encode())
+        if substitution is not None:
+            digest.update(substitution.alphabet.encode())
+            digest.update(substitution.scores.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Return the stored entry as a dict with "record" and any stored
+        arrays ("matrix", "directions"), or None when it is not cached.
+        An entry that cannot be read (truncated, corrupt) counts as a miss
+        and is deleted.
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                entry = {name: archive[name] for name in archive.files}
+            entry["record"] = json.loads(str(entry["record"]))
+        except Exception:
+            # BadZipFile, EOFError, KeyError, ValueError, ...: all unusable
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        os.utime(path)
+        return entry
+
+    def put(self, key: str, record: Dict, **arrays: Optional[np.ndarray]) -> None:
+        """
+        Store record (JSON-serialisable) and the given arrays under key,
+        then evict the least recently used entries beyond max_bytes.
+        None arrays are skipped, and so are all arrays when together they
+        would not fit in max_bytes; the record alone is stored then.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        stored = {
+            name: np.asarray(value)
+            for name, value in arrays.items()
+            if value is not None
+        }
+        if sum(array.nbytes for array in stored.values()) > self.max_bytes:
+            stored = {}
+        stored["record"] = np.array(json.dumps(record))
+        # write to a temporary file first so readers never see half an entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **stored)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict(keep=key)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Delete the least recently used entries until the directory fits in
+        max_bytes; the entry named keep is only removed if it alone is
+        too large.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # evicted concurrently
+            entries.append(
+                (name != f"{keep}{_SUFFIX}", stat.st_mtime, stat.st_size, name)
+            )
+        total = sum(entry[2] for entry in entries)
+        # evictable entries first, oldest first
+        for _, _, size, name in sorted(entries, key=lambda e: (not e[0], e[1])):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -1,23 +1,61 @@
 import argparse
 import os
-from aligner.html_report import format_html_report
-from typing import Optional
-from aligner.plot import plot_matrix
-from aligner.pdf_report import write_pdf
+import sys
+import time
+from itertools import chain, islice
+import numpy as np
+from typing import Dict, Iterable, Iterator, Optional
+from aligner.models import AlignmentResult, Sequence
 from aligner.core import (
+    ENGINES,
+    affine_traceback,
+    alignment_result,
+    banded_align,
+    build_affine_matrices,
+    build_direction_matrix,
     build_score_matrix,
+    count_optimal_paths,
+    hirschberg,
+    iter_optimal_paths,
+    optimal_path_counts,
+    sample_optimal_paths,
+    score_only,
     traceback as single_traceback,
-    trace_all_paths,
+)
+from aligner.cache import DEFAULT_CACHE_BYTES, AlignmentCache
+from aligner.batch import (
+    all_vs_all,
+    cross_pairs,
+    identity_distances,
+    read_pairs,
+    run_batch,
+    search,
 )
 from aligner.io import (
+    MATRIX_MODES,
+    SUMMARY_FIELDS,
     create_output_dict,
-    format_multi_report,
+    fetch_record,
+    format_summary_row,
+    iter_fasta,
+    iter_phylip_lines,
     format_report,
+    iter_multi_report,
+    parse_region,
     read_manual,
     read_fasta,
+    write_distance_matrix,
     write_json,
+    write_jsonl,
     write_matrix,
     write_report,
+    write_report_lines,
+)
+from aligner.writers import get_writer
+from aligner.scoring import (
+    BUILTIN_MATRICES,
+    SubstitutionMatrix,
+    load_substitution_matrix,
 )
 
 
@@ -34,13 +72,29 @@ def parse_args(args=None):
         "--input",
         nargs=2,
         metavar=("FASTA1", "FASTA2"),
-        help="Paths to two input FASTA files",
+        help="Paths to two input FASTA files; FILE:ID or FILE:ID:START-END "
+        "reads one record (or a 1-based range of it) through a .fai index",
     )
     group.add_argument(
         "--manual",
         action="store_true",
         help="Enter sequences manually via prompts",
     )
+    group.add_argument(
+        "--all-vs-all",
+        metavar="FASTA",
+        default=None,
+        help="Align every pair of records in one multi-FASTA and write a "
+        "PHYLIP (or .npy) identity distance matrix",
+    )
+    group.add_argument(
+        "--search",
+        nargs=2,
+        metavar=("QUERY", "DATABASE"),
+        default=None,
+        help="Score one query record against every record of a multi-FASTA "
+        "database and write summary rows of the --top best alignments",
+    )
     parser.add_argument(
         "--match",
         type=int,
@@ -59,6 +113,19 @@ def parse_args(args=None):
         default=-2,
         help="Penalty for a gap (default: -2)",
     )
+    parser.add_argument(
+        "--gap-open",
+        type=int,
+        default=None,
+        help="Affine gaps: score of the first position of a gap "
+        "(use with --gap-extend; replaces --gap)",
+    )
+    parser.add_argument(
+        "--gap-extend",
+        type=int,
+        default=None,
+        help="Affine gaps: score of every further position of a gap",
+    )
     parser.add_argument(
         "--output",
         type=str,
@@ -72,18 +139,49 @@ def parse_args(args=None):
         help="Enumerate and output all optimal alignments",
     )
 
+    parser.add_argument(
+        "--max-paths",
+        type=int,
+        default=100,
+        help="Maximum number of alignments listed by --all-paths (default: 100)",
+    )
+
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=None,
+        metavar="K",
+        help="With --all-paths, list K optimal alignments drawn uniformly at "
+        "random instead of the first --max-paths",
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for --sample",
+    )
+
     parser.add_argument(
         "--plot",
         type=str,
         default=None,
-        help="Optional filename for PNG heatmap output",
+        help="Optional filename for PNG heatmap output; large matrices are "
+        "max-pooled to the image resolution",
+    )
+
+    parser.add_argument(
+        "--plot-trace",
+        action="store_true",
+        help="Draw the traceback path of the (first) alignment over --plot",
     )
 
     parser.add_argument(
         "--matrix-out",
         type=str,
         default=None,
-        help="Filename for raw score matrix output (CSV)",
+        help="Filename for raw score matrix output: CSV, or binary NumPy "
+        "for .npy (memory-mappable) and .npz (compressed)",
     )
 
     parser.add_argument(
@@ -91,7 +189,16 @@ def parse_args(args=None):
         dest="json_out",
         type=str,
         default=None,
-        help="Filename for structured JSON output",
+        help="Filename for structured JSON output; a .jsonl name writes one "
+        "compact JSON alignment per line instead",
+    )
+
+    parser.add_argument(
+        "--json-matrix",
+        choices=MATRIX_MODES,
+        default="full",
+        help="Score matrix in --json output: every row, a summary of its "
+        "shape and range, or none (default: full)",
     )
 
     parser.add_argument(
@@ -117,7 +224,210 @@ def parse_args(args=None):
         help="Alphabet for sequences (dna or protein)",
     )
 
-    return parser.parse_args(args)
+    parser.add_argument(
+        "--substitution-matrix",
+        metavar="NAME_OR_PATH",
+        default=None,
+        help="Score aligned pairs with a substitution matrix instead of "
+        f"--match/--mismatch: {', '.join(BUILTIN_MATRICES)} or a file in NCBI "
+        "matrix format",
+    )
+
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="python",
+        help="Matrix fill engine: pure Python or vectorized NumPy (default: python)",
+    )
+
+    parser.add_argument(
+        "--mode",
+        choices=["full", "hirschberg", "banded"],
+        default="full",
+        help="full: score matrix plus traceback; hirschberg: linear-space "
+        "alignment without a matrix; banded: exact alignment filling only a "
+        "diagonal band (default: full)",
+    )
+
+    parser.add_argument(
+        "--band",
+        type=int,
+        default=16,
+        help="Initial band half-width for --mode banded, doubled until the "
+        "score is provably optimal (default: 16)",
+    )
+
+    parser.add_argument(
+        "--directions",
+        action="store_true",
+        help="Record a packed direction matrix during the fill and trace back "
+        "from it instead of keeping the score matrix",
+    )
+
+    parser.add_argument(
+        "--score-only",
+        action="store_true",
+        help="Only compute the optimal score (linear memory, no traceback)",
+    )
+
+    parser.add_argument(
+        "--min-score",
+        type=int,
+        default=None,
+        help="With --score-only or batch mode, reject pairs scoring below "
+        "this cutoff, stopping each fill as soon as it cannot be reached",
+    )
+
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Align every record of FASTA1 against every record of FASTA2 and "
+        "write one tab-separated summary row per pair",
+    )
+
+    parser.add_argument(
+        "--pairs",
+        type=str,
+        default=None,
+        help="With --input, align only the listed 'ID1 ID2' pairs (one per "
+        "line) in batch mode",
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Number of best-scoring database records --search reports "
+        "(default: 10)",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --batch, --all-vs-all and --search "
+        "(default: one per CPU)",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Reuse results of earlier runs on the same sequences and "
+        "parameters, cached in this directory",
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_BYTES >> 20,
+        metavar="MB",
+        help="Size bound of --cache-dir; least recently used entries are "
+        f"evicted beyond it (default: {DEFAULT_CACHE_BYTES >> 20})",
+    )
+
+    parser.add_argument(
+        "--cache-arrays",
+        action="store_true",
+        help="Also cache the score (or direction) matrix, so later runs can "
+        "write --matrix-out, --plot, matrix JSON or --all-paths from the "
+        "cache; runs requesting those outputs store it anyway",
+    )
+
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Report fill (or score-only) time and cell updates per second, "
+        "or the lookup time of a cache hit, on stderr",
+    )
+
+    parsed = parser.parse_args(args)
+    if (parsed.gap_open is None) != (parsed.gap_extend is None):
+        parser.error("--gap-open and --gap-extend must be given together")
+    if parsed.gap_open is not None and (
+        parsed.mode != "full"
+        or parsed.directions
+        or parsed.all_paths
+        or parsed.score_only
+        or parsed.batch
+        or parsed.pairs
+        or parsed.all_vs_all
+        or parsed.search
+    ):
+        parser.error(
+            "affine gaps support single full alignments only (no --mode, "
+            "--directions, --all-paths, --score-only or batch modes)"
+        )
+    json_matrix = (
+        parsed.json_out
+        and parsed.json_matrix != "none"
+        and not parsed.json_out.endswith(".jsonl")
+    )
+    if parsed.mode != "full" and (
+        parsed.matrix_out or parsed.plot or json_matrix or parsed.all_paths
+    ):
+        parser.error(
+            f"--mode {parsed.mode} keeps no full score matrix and cannot be "
+            "combined with --matrix-out, --plot, --json (unless --json-matrix "
+            "none) or --all-paths"
+        )
+    if parsed.directions and (
+        parsed.mode != "full" or parsed.matrix_out or parsed.plot or json_matrix
+    ):
+        parser.error(
+            "--directions keeps no score matrix and cannot be combined with "
+            "--mode, --matrix-out, --plot or --json (unless --json-matrix none)"
+        )
+    if parsed.all_vs_all and (
+        parsed.matrix_out
+        or parsed.plot
+        or parsed.json_out
+        or parsed.html_out
+        or parsed.pdf_out
+        or parsed.all_paths
+    ):
+        parser.error("--all-vs-all writes a distance matrix only")
+    if parsed.pairs:
+        parsed.batch = True
+    if parsed.batch and not parsed.input:
+        parser.error("batch mode requires --input FASTA1 FASTA2")
+    if parsed.batch and (
+        parsed.matrix_out
+        or parsed.plot
+        or parsed.json_out
+        or parsed.html_out
+        or parsed.pdf_out
+        or parsed.all_paths
+    ):
+        parser.error("batch mode writes summary rows only")
+    if parsed.search and (
+        parsed.matrix_out
+        or parsed.plot
+        or parsed.json_out
+        or parsed.html_out
+        or parsed.pdf_out
+        or parsed.all_paths
+        or parsed.pairs
+    ):
+        parser.error("--search writes summary rows only")
+    if parsed.score_only and (
+        parsed.matrix_out
+        or parsed.plot
+        or parsed.json_out
+        or parsed.html_out
+        or parsed.pdf_out
+        or parsed.all_paths
+    ):
+        parser.error("--score-only cannot be combined with alignment outputs")
+    if parsed.score_only and (parsed.batch or parsed.all_vs_all or parsed.search):
+        parser.error(
+            "--score-only applies to a single pair; batch, --all-vs-all and "
+            "--search modes choose their own fills"
+        )
+    if parsed.min_score is not None and not (parsed.score_only or parsed.batch):
+        parser.error("--min-score requires --score-only or batch mode")
+    return parsed
 
 
 def main():
@@ -125,6 +435,7 @@ def main():
     Main function to run the Needleman–Wunsch aligner from the command line.
     """
     args = parse_args()
+    substitution = load_scoring(args)
 
     if args.output:
         os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
@@ -137,77 +448,495 @@ def main():
     if args.html_out:
         os.makedirs(os.path.dirname(args.html_out) or ".", exist_ok=True)
 
+    if args.batch:
+        run_batch_mode(args, substitution)
+        return
+    if args.all_vs_all:
+        run_all_vs_all_mode(args, substitution)
+        return
+    if args.search:
+        run_search_mode(args, substitution)
+        return
+
     if args.manual:
         seq1, seq2 = read_manual(args.alphabet)
     else:
-        recs1 = read_fasta(args.input[0], args.alphabet)
-        recs2 = read_fasta(args.input[1], args.alphabet)
+        # two records are enough to tell a multi-record file apart
+        recs1 = list(islice(iter_input(args.input[0], args.alphabet), 2))
+        recs2 = list(islice(iter_input(args.input[1], args.alphabet), 2))
         if len(recs1) != 1 or len(recs2) != 1:
-            raise ValueError("Each FASTA must contain exactly one record")
+            raise ValueError(
+                "Each FASTA must contain exactly one record "
+                "(use --batch for multi-record files)"
+            )
         seq1, seq2 = recs1[0], recs2[0]
 
-    matrix = build_score_matrix(seq1, seq2, args.match, args.mismatch, args.gap)
+    gap, gap_extend = args.gap, None
+    if args.gap_open is not None:
+        gap, gap_extend = args.gap_open, args.gap_extend
+
+    sub_name = substitution.name if substitution is not None else None
+    cache = cache_key = None
+    if args.cache_dir:
+        cache = AlignmentCache(args.cache_dir, args.cache_size << 20)
+        cache_key = cache.key(
+            seq1,
+            seq2,
+            substitution,
+            match=args.match,
+            mismatch=args.mismatch,
+            gap=gap,
+            gap_extend=gap_extend,
+            mode=args.mode,
+            band=args.band,
+            directions=args.directions,
+            score_only=args.score_only,
+            min_score=args.min_score,
+        )
+    start = time.perf_counter()
+    entry = cache.get(cache_key) if cache is not None else None
+    array_name = "directions" if args.directions else "matrix"
+    if entry is not None and not args.score_only and array_name not in entry:
+        # a hit must either hold the alignment or let it be traced back
+        if needs_matrix(args) or entry["record"].get("alignment") is None:
+            entry = None
+
+    if args.score_only:
+        if entry is not None:
+            score = entry["record"]["score"]
+            label = "cache"
+        else:
+            start = time.perf_counter()
+            score = score_only(
+                seq1,
+                seq2,
+                args.match,
+                args.mismatch,
+                args.gap,
+                substitution=substitution,
+                min_score=args.min_score,
+            )
+            label = "score-only"
+        if args.timing:
+            report_timing(label, len(seq1) * len(seq2), time.perf_counter() - start)
+        if entry is None and cache is not None:
+            cache.put(cache_key, {"score": score})
+        if score is None:
+            score = f"rejected (below --min-score {args.min_score})"
+        if args.output:
+            write_report(args.output, f"Score: {score}\n")
+        else:
+            print(f"Score: {score}")
+        return
+
+    if entry is not None:
+        matrix = entry.get("matrix")
+        directions = entry.get("directions")
+        aln1, aln2 = entry["record"]["alignment"] or (None, None)
+        label = "cache"
+    else:
+        start = time.perf_counter()
+        matrix, directions, aln1, aln2, label = fill_alignment(
+            args, seq1, seq2, gap, gap_extend, substitution
+        )
+    if args.timing:
+        report_timing(label, len(seq1) * len(seq2), time.perf_counter() - start)
+
+    # the cached record keeps the single alignment, even on --all-paths runs
+    if aln1 is None and (not args.all_paths or cache is not None):
+        aln1, aln2 = single_traceback(
+            matrix,
+            seq1,
+            seq2,
+            args.match,
+            args.mismatch,
+            args.gap,
+            directions=directions,
+            substitution=substitution,
+        )
+    score = None
+    if entry is not None:
+        score = entry["record"].get("score")
+    elif matrix is not None:
+        score = int(matrix[len(seq1)][len(seq2)])
+    if cache is not None and entry is None:
+        record = {"alignment": [aln1, aln2] if aln1 is not None else None}
+        if score is not None:
+            record["score"] = score
+        if args.cache_arrays or needs_matrix(args):
+            cache.put(cache_key, record, matrix=matrix, directions=directions)
+        else:
+            cache.put(cache_key, record)
 
     if args.matrix_out:
         write_matrix(args.matrix_out, matrix)
 
-    if args.all_paths:
-        align_list = trace_all_paths(
-            matrix, seq1, seq2, args.match, args.mismatch, args.gap
+    def to_result(aligned1: str, aligned2: str) -> AlignmentResult:
+        return alignment_result(
+            aligned1,
+            aligned2,
+            args.match,
+            args.mismatch,
+            gap,
+            substitution=substitution,
+            gap_extend=gap_extend,
+            score=score,
         )
-        report_text = format_multi_report(
-            seq1, seq2, align_list, args.match, args.mismatch, args.gap
+
+    if args.all_paths:
+        counts = None
+        if args.sample:
+            # built once: the total and the sampler share the table
+            counts = optimal_path_counts(
+                matrix,
+                seq1,
+                seq2,
+                args.match,
+                args.mismatch,
+                args.gap,
+                directions=directions,
+                substitution=substitution,
+            )
+            total = counts[-1][-1]
+        else:
+            total = count_optimal_paths(
+                matrix,
+                seq1,
+                seq2,
+                args.match,
+                args.mismatch,
+                args.gap,
+                directions=directions,
+                substitution=substitution,
+            )
+        if args.sample:
+            paths = iter(
+                sample_optimal_paths(
+                    matrix,
+                    seq1,
+                    seq2,
+                    args.match,
+                    args.mismatch,
+                    args.gap,
+                    args.sample,
+                    seed=args.seed,
+                    directions=directions,
+                    substitution=substitution,
+                    counts=counts,
+                )
+            )
+            shown = args.sample
+        else:
+            paths = islice(
+                iter_optimal_paths(
+                    matrix,
+                    seq1,
+                    seq2,
+                    args.match,
+                    args.mismatch,
+                    args.gap,
+                    directions=directions,
+                    substitution=substitution,
+                ),
+                args.max_paths,
+            )
+            shown = min(total, args.max_paths)
+        results = (to_result(aln1, aln2) for aln1, aln2 in paths)
+        if args.json_out or args.html_out or args.pdf_out or args.plot_trace:
+            results = list(results)
+        report_lines = iter_multi_report(
+            seq1,
+            seq2,
+            results,
+            args.match,
+            args.mismatch,
+            args.gap,
+            total=total,
+            shown=shown,
+            substitution_matrix=sub_name,
         )
     else:
-        aln1, aln2 = single_traceback(
-            matrix, seq1, seq2, args.match, args.mismatch, args.gap
-        )
-        align_list = [(aln1, aln2)]
-        report_text = format_report(
-            seq1, seq2, aln1, aln2, args.match, args.mismatch, args.gap
+        results = [to_result(aln1, aln2)]
+        report = format_report(
+            seq1,
+            seq2,
+            results[0],
+            args.match,
+            args.mismatch,
+            gap,
+            gap_extend,
+            substitution_matrix=sub_name,
         )
+        report_lines = iter([report])
 
     if args.output:
-        write_report(args.output, report_text)
+        write_report_lines(args.output, report_lines)
     else:
         # Print report to console when no output file is specified
-        print(report_text)
+        for line in report_lines:
+            print(line)
 
-    if args.json_out:
+    jsonl = args.json_out and args.json_out.endswith(".jsonl")
+    if jsonl:
+        records = (
+            {"id1": seq1.id, "id2": seq2.id, **result.as_dict()} for result in results
+        )
+        write_jsonl(args.json_out, records)
+    if (args.json_out and not jsonl) or args.html_out or args.pdf_out:
+        # built once: the JSON, HTML and PDF reports share the parameters
         data = create_output_dict(
-            seq1, seq2, matrix, align_list, args.match, args.mismatch, args.gap
+            seq1,
+            seq2,
+            matrix,
+            results,
+            args.match,
+            args.mismatch,
+            gap,
+            gap_extend=gap_extend,
+            substitution_matrix=sub_name,
+            matrix_mode=args.json_matrix if args.json_out and not jsonl else "none",
         )
+    if args.json_out and not jsonl:
         write_json(args.json_out, data)
 
     if args.html_out:
         img_ref = None
         if args.plot:
             img_ref = os.path.relpath(args.plot, start=os.path.dirname(args.html_out))
-        data = create_output_dict(
-            seq1, seq2, matrix, align_list, args.match, args.mismatch, args.gap
-        )
-        html = format_html_report(
-            seq1, seq2, data["alignments"], data["parameters"], img_ref
-        )
+        html = get_writer("html")(seq1, seq2, results, data["parameters"], img_ref)
         with open(args.html_out, "w") as f:
             f.write(html)
 
     if args.plot:
-        plot_matrix(matrix, args.plot)
+        trace = results[0] if args.plot_trace and results else None
+        get_writer("plot")(matrix, args.plot, alignment=trace)
 
     if args.pdf_out:
-        data = create_output_dict(
-            seq1, seq2, matrix, align_list, args.match, args.mismatch, args.gap
-        )
-        write_pdf(
+        get_writer("pdf")(
             args.pdf_out,
             seq1,
             seq2,
-            data["alignments"],
+            results,
             data["parameters"],
             args.plot,
         )
 
 
+def report_timing(label: str, cells: int, elapsed: float) -> None:
+    """
+    Print the --timing line of a fill to stderr. A cache hit computes no
+    cells, so only its lookup time is reported.
+    """
+    if label == "cache":
+        print(f"Fill (cache): lookup in {elapsed:.3f} s", file=sys.stderr)
+        return
+    rate = cells / max(elapsed, 1e-9)
+    print(
+        f"Fill ({label}): {cells} cells in {elapsed:.3f} s "
+        f"({rate / 1e6:.2f} MCUPS)",
+        file=sys.stderr,
+    )
+
+
+def needs_matrix(args) -> bool:
+    """
+    Tell whether an output of this run reads the score (or direction)
+    matrix, beyond the single alignment.
+    """
+    json_matrix = (
+        args.json_out
+        and args.json_matrix != "none"
+        and not args.json_out.endswith(".jsonl")
+    )
+    return bool(args.matrix_out or args.plot or json_matrix or args.all_paths)
+
+
+def iter_input(spec: str, alphabet: str) -> Iterator[Sequence]:
+    """
+    Yield the records named by an --input argument: every record of a FASTA
+    file, or the single record (range) selected by FILE:ID[:START-END].
+    """
+    region = parse_region(spec)
+    if region is None:
+        return iter_fasta(spec, alphabet)
+    path, name, start, end = region
+    return iter([fetch_record(path, name, start, end, alphabet)])
+
+
+def load_scoring(args) -> Optional[SubstitutionMatrix]:
+    """
+    Load the substitution matrix named by --substitution-matrix, if any.
+    """
+    if args.substitution_matrix is None:
+        return None
+    return load_substitution_matrix(args.substitution_matrix)
+
+
+def fill_alignment(args, seq1, seq2, gap, gap_extend, substitution):
+    """
+    Run the fill selected by the arguments and return (matrix, directions,
+    aln1, aln2, label); entries a mode does not produce are None.
+    """
+    directions = None
+    aln1 = aln2 = None
+    if gap_extend is not None:
+        affine = build_affine_matrices(
+            seq1,
+            seq2,
+            args.match,
+            args.mismatch,
+            gap,
+            gap_extend,
+            substitution=substitution,
+        )
+        matrix = np.maximum.reduce(affine)
+        aln1, aln2 = affine_traceback(
+            affine,
+            seq1,
+            seq2,
+            args.match,
+            args.mismatch,
+            gap,
+            gap_extend,
+            substitution=substitution,
+        )
+        label = "affine"
+    elif args.mode == "hirschberg":
+        matrix = None
+        aln1, aln2 = hirschberg(
+            seq1,
+            seq2,
+            args.match,
+            args.mismatch,
+            args.gap,
+            substitution=substitution,
+        )
+        label = "hirschberg"
+    elif args.mode == "banded":
+        matrix = None
+        aln1, aln2 = banded_align(
+            seq1,
+            seq2,
+            args.match,
+            args.mismatch,
+            args.gap,
+            band=args.band,
+            substitution=substitution,
+        )
+        label = "banded"
+    elif args.directions:
+        matrix = None
+        directions = build_direction_matrix(
+            seq1,
+            seq2,
+            args.match,
+            args.mismatch,
+            args.gap,
+            substitution=substitution,
+        )
+        label = "directions"
+    else:
+        matrix = build_score_matrix(
+            seq1,
+            seq2,
+            args.match,
+            args.mismatch,
+            args.gap,
+            engine=args.engine,
+            substitution=substitution,
+        )
+        label = args.engine
+    return matrix, directions, aln1, aln2, label
+
+
+def run_batch_mode(args, substitution: Optional[SubstitutionMatrix] = None) -> None:
+    """
+    Align many pairs from the two input FASTA files and stream one summary
+    row per pair to the output file or stdout; an output file named .jsonl
+    gets one JSON object per pair instead.
+    """
+    recs2 = list(iter_input(args.input[1], args.alphabet))
+    if args.pairs:
+        recs1 = list(iter_input(args.input[0], args.alphabet))
+        pairs = read_pairs(args.pairs, recs1, recs2)
+    else:
+        # stream FASTA1 so the first pairs are aligned while it is parsed
+        pairs = cross_pairs(iter_input(args.input[0], args.alphabet), recs2)
+    rows = run_batch(
+        pairs,
+        args.match,
+        args.mismatch,
+        args.gap,
+        workers=args.workers,
+        substitution=substitution,
+        min_score=args.min_score,
+    )
+    write_summary_rows(args, rows)
+
+
+def run_search_mode(args, substitution: Optional[SubstitutionMatrix] = None) -> None:
+    """
+    Search the database FASTA for the records that align best with the
+    query and write their summary rows, best first, like run_batch_mode.
+    """
+    query_spec, database_spec = args.search
+    queries = list(islice(iter_input(query_spec, args.alphabet), 2))
+    if len(queries) != 1:
+        raise ValueError("The query FASTA must contain exactly one record")
+    rows = search(
+        queries[0],
+        iter_input(database_spec, args.alphabet),
+        args.match,
+        args.mismatch,
+        args.gap,
+        top=args.top,
+        workers=args.workers,
+        substitution=substitution,
+    )
+    write_summary_rows(args, rows)
+
+
+def write_summary_rows(args, rows: Iterable[Dict]) -> None:
+    """
+    Write summary rows as tab-separated lines under a header, to the output
+    file or stdout; an output file named .jsonl gets one JSON object per row.
+    """
+    if args.output and args.output.endswith(".jsonl"):
+        write_jsonl(args.output, rows)
+        return
+    lines = (format_summary_row(row) for row in rows)
+    header = ["\t".join(SUMMARY_FIELDS)]
+    if args.output:
+        write_report_lines(args.output, chain(header, lines, [""]))
+    else:
+        for line in chain(header, lines):
+            print(line, flush=True)
+
+
+def run_all_vs_all_mode(
+    args, substitution: Optional[SubstitutionMatrix] = None
+) -> None:
+    """
+    Compare all records of one FASTA file pairwise and write the identity
+    distance matrix to the output file (PHYLIP, or NumPy for .npy) or stdout.
+    """
+    records = read_fasta(args.all_vs_all, args.alphabet)
+    _, identity = all_vs_all(
+        records,
+        args.match,
+        args.mismatch,
+        args.gap,
+        workers=args.workers,
+        substitution=substitution,
+    )
+    distances = identity_distances(identity)
+    ids = [rec.id for rec in records]
+    if args.output:
+        write_distance_matrix(args.output, ids, distances)
+    else:
+        for line in iter_phylip_lines(ids, distances):
+            print(line)
+
+
 if __name__ == "__main__":
     main()
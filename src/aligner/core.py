@@ -1,10 +1,28 @@
-from typing import List, Tuple
-from aligner.models import Sequence
+import random
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Tuple
+import numpy as np
+from aligner.models import AlignmentResult, Sequence
+from aligner.scoring import SubstitutionMatrix, resolve_scoring
+
+ENGINES = ("python", "numpy")
+
+# Flag bits of a direction matrix cell: which moves reach it optimally.
+DIAG = 1
+UP = 2
+LEFT = 4
 
 
 def build_score_matrix(
-    seq1: Sequence, seq2: Sequence, match: int, mismatch: int, gap: int
-) -> List[List[int]]:
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    engine: str = "python",
+    substitution: Optional[SubstitutionMatrix] = None,
+):
     """
     Build and return the scoring matrix for global alignment using
     the Needleman–Wunsch algorithm.
@@ -14,10 +32,120 @@ def build_score_matrix(
     :param match: Score for a match
     :param mismatch: Score for a mismatch
     :param gap: Gap penalty (negative)
+    :param engine: "python" for nested lists, "numpy" for the vectorized
+        anti-diagonal fill returning an int64 ndarray with identical values
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
     :return: A (len(seq1)+1) x (len(seq2)+1) matrix of scores
     """
-    n = len(seq1)
-    m = len(seq2)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+    if engine == "python":
+        return _fill_python(a, b, table.scores, gap)
+    return _fill_antidiagonal(a, b, table.scores, gap)
+
+
+def alignment_score(
+    aligned1: str,
+    aligned2: str,
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+    gap_extend: Optional[int] = None,
+) -> int:
+    """
+    Score an alignment column by column.
+
+    :param aligned1: First aligned string (with '-' for gaps)
+    :param aligned2: Second aligned string (with '-' for gaps)
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty (the gap opening score with gap_extend)
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :param gap_extend: Score of every further position of a gap, for affine
+        scoring
+    :return: The alignment score
+    """
+    score = 0
+    previous = None  # which row the previous column had a gap in
+    for char1, char2 in zip(aligned1, aligned2):
+        if char1 == "-" or char2 == "-":
+            row = 1 if char1 == "-" else 2
+            extends = gap_extend is not None and row == previous
+            score += gap_extend if extends else gap
+            previous = row
+            continue
+        previous = None
+        if substitution is not None:
+            score += substitution.score(char1, char2)
+        elif char1 == char2:
+            score += match
+        else:
+            score += mismatch
+    return score
+
+
+def alignment_result(
+    aligned1: str,
+    aligned2: str,
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+    gap_extend: Optional[int] = None,
+    score: Optional[int] = None,
+) -> AlignmentResult:
+    """
+    Package an alignment as an AlignmentResult, the single object every
+    reporter reads; its statistics are computed once, on first use.
+
+    :param aligned1: First aligned string (with '-' for gaps)
+    :param aligned2: Second aligned string (with '-' for gaps)
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty (the gap opening score with gap_extend)
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :param gap_extend: Score of every further position of a gap, for affine
+        scoring
+    :param score: The alignment score when already known (e.g. the final
+        cell of the matrix), which skips rescoring the alignment
+    :return: The alignment result
+    """
+    if score is None:
+        score = alignment_score(
+            aligned1, aligned2, match, mismatch, gap, substitution, gap_extend
+        )
+    return AlignmentResult(aligned1, aligned2, score)
+
+
+def _encode_pair(
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    substitution: Optional[SubstitutionMatrix],
+) -> Tuple[SubstitutionMatrix, np.ndarray, np.ndarray]:
+    """
+    Resolve the scoring table and encode both sequences with it once.
+    """
+    table = resolve_scoring(substitution, match, mismatch)
+    return table, table.encode(seq1.data), table.encode(seq2.data)
+
+
+def _fill_python(
+    a: np.ndarray, b: np.ndarray, scores: np.ndarray, gap: int
+) -> List[List[int]]:
+    """
+    Reference cell-by-cell fill over nested Python lists.
+    """
+    n = len(a)
+    m = len(b)
+    # pair scores gathered in one go: sub[i - 1][j - 1] scores a[i-1], b[j-1]
+    sub = scores[np.ix_(a, b)].tolist()
     matrix: List[List[int]] = [[0] * (m + 1) for _ in range(n + 1)]
 
     for i in range(1, n + 1):
@@ -27,13 +155,9 @@ def build_score_matrix(
         matrix[0][j] = matrix[0][j - 1] + gap
 
     for i in range(1, n + 1):
+        row = sub[i - 1]
         for j in range(1, m + 1):
-            char1 = seq1.sequence[i - 1]
-            char2 = seq2.sequence[j - 1]
-            if char1 == char2:
-                diag = matrix[i - 1][j - 1] + match
-            else:
-                diag = matrix[i - 1][j - 1] + mismatch
+            diag = matrix[i - 1][j - 1] + row[j - 1]
             up = matrix[i - 1][j] + gap
             left = matrix[i][j - 1] + gap
             matrix[i][j] = max(diag, up, left)
@@ -41,54 +165,127 @@ def build_score_matrix(
     return matrix
 
 
+def _fill_antidiagonal(
+    a: np.ndarray, b: np.ndarray, scores: np.ndarray, gap: int
+) -> np.ndarray:
+    """
+    Fill the matrix one anti-diagonal at a time.
+
+    In the flattened row-major buffer, the cells of an anti-diagonal
+    (i + j constant) are exactly m positions apart, and so are their diag,
+    up and left neighbours. Every diagonal is therefore a strided view and
+    can be updated with a handful of whole-array operations.
+    """
+    n, m = len(a), len(b)
+    matrix = np.zeros((n + 1, m + 1), dtype=np.int64)
+    matrix[:, 0] = np.arange(n + 1, dtype=np.int64) * gap
+    matrix[0, :] = np.arange(m + 1, dtype=np.int64) * gap
+    if n == 0 or m == 0:
+        return matrix
+
+    flat = matrix.reshape(-1)
+    for d in range(2, n + m + 1):
+        lo = max(1, d - m)
+        hi = min(n, d - 1)
+        count = hi - lo + 1
+        # cell (i, d - i) lives at flat index i * m + d
+        start = lo * m + d
+        stop = start + (count - 1) * m + 1
+
+        rev = b[d - hi - 1 : d - lo][::-1]
+        sub = scores[a[lo - 1 : hi], rev]
+        best = flat[start - m - 2 : stop - m - 2 : m] + sub
+        np.maximum(best, flat[start - m - 1 : stop - m - 1 : m] + gap, out=best)
+        np.maximum(best, flat[start - 1 : stop - 1 : m] + gap, out=best)
+        flat[start:stop:m] = best
+
+    return matrix
+
+
 def traceback(
-    matrix: List[List[int]],
+    matrix: Optional[List[List[int]]],
     seq1: Sequence,
     seq2: Sequence,
     match: int,
     mismatch: int,
     gap: int,
+    directions: Optional[np.ndarray] = None,
+    substitution: Optional[SubstitutionMatrix] = None,
 ) -> Tuple[str, str]:
     """
     Perform a traceback through the scoring matrix to recover one optimal alignment.
 
-    :param matrix: Scoring matrix from build_score_matrix
+    :param matrix: Scoring matrix from build_score_matrix (may be None when
+        directions is given)
     :param seq1: First sequence
     :param seq2: Second sequence
     :param match: Score for a match
     :param mismatch: Score for a mismatch
     :param gap: Gap penalty
+    :param directions: Direction matrix from build_direction_matrix
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
     :return: A tuple of aligned strings (with '-' for gaps)
     """
-    i, j = len(seq1), len(seq2)
+    s1, s2 = seq1.sequence, seq2.sequence
+    if directions is not None:
+        return _traceback(directions.item, s1, s2)
+    table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+    return _traceback(_matrix_flags(matrix, a, b, table.scores, gap), s1, s2)
+
+
+def _matrix_flags(
+    matrix, a: np.ndarray, b: np.ndarray, scores: np.ndarray, gap: int
+) -> Callable[[int, int], int]:
+    """
+    Return a function giving the DIAG/UP/LEFT flags of a cell by comparing
+    its score with its neighbours'.
+    """
+    codes1, codes2 = a.tolist(), b.tolist()
+    pair = scores.item
+
+    def flags(i: int, j: int) -> int:
+        here = matrix[i][j]
+        found = 0
+        if i > 0 and j > 0:
+            sub = pair(codes1[i - 1], codes2[j - 1])
+            if here == matrix[i - 1][j - 1] + sub:
+                found |= DIAG
+        if i > 0 and here == matrix[i - 1][j] + gap:
+            found |= UP
+        if j > 0 and here == matrix[i][j - 1] + gap:
+            found |= LEFT
+        return found
+
+    return flags
+
+
+def _traceback(flags: Callable[[int, int], int], s1: str, s2: str) -> Tuple[str, str]:
+    """
+    Walk back from the last cell preferring diagonal, then up, then left
+    moves; shared by every aligner that ends in a traceback.
+    """
+    i, j = len(s1), len(s2)
     aligned1: List[str] = []
     aligned2: List[str] = []
 
     while i > 0 or j > 0:
-        if i > 0 and j > 0:
-            char1 = seq1.sequence[i - 1]
-            char2 = seq2.sequence[j - 1]
-            if char1 == char2:
-                score_diag = matrix[i - 1][j - 1] + match
-            else:
-                score_diag = matrix[i - 1][j - 1] + mismatch
-            if matrix[i][j] == score_diag:
-                aligned1.append(char1)
-                aligned2.append(char2)
-                i -= 1
-                j -= 1
-                continue
-        if i > 0 and matrix[i][j] == matrix[i - 1][j] + gap:
-            aligned1.append(seq1.sequence[i - 1])
+        found = flags(i, j)
+        if found & DIAG:
+            aligned1.append(s1[i - 1])
+            aligned2.append(s2[j - 1])
+            i -= 1
+            j -= 1
+        elif found & UP:
+            aligned1.append(s1[i - 1])
             aligned2.append("-")
             i -= 1
-            continue
-        if j > 0 and matrix[i][j] == matrix[i][j - 1] + gap:
+        elif found & LEFT:
             aligned1.append("-")
-            aligned2.append(seq2.sequence[j - 1])
+            aligned2.append(s2[j - 1])
             j -= 1
-            continue
-        break
+        else:
+            break
 
     aligned1.reverse()
     aligned2.reverse()
@@ -96,52 +293,1216 @@ def traceback(
 
 
 def trace_all_paths(
-    matrix: List[List[int]],
+    matrix: Optional[List[List[int]]],
     seq1: Sequence,
     seq2: Sequence,
     match: int,
     mismatch: int,
     gap: int,
     max_paths: int = 100,
+    directions: Optional[np.ndarray] = None,
+    substitution: Optional[SubstitutionMatrix] = None,
 ) -> List[Tuple[str, str]]:
     """
     Enumerate all optimal alignment paths through the scoring matrix.
 
-    :param matrix: Scoring matrix from build_score_matrix
+    :param matrix: Scoring matrix from build_score_matrix (may be None when
+        directions is given)
     :param seq1: First sequence
     :param seq2: Second sequence
     :param match: Score for a match
     :param mismatch: Score for a mismatch
     :param gap: Gap penalty
     :param max_paths: Maximum number of alignments to return
+    :param directions: Direction matrix from build_direction_matrix
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
     :return: List of tuples of aligned strings
     """
+    paths = iter_optimal_paths(
+        matrix,
+        seq1,
+        seq2,
+        match,
+        mismatch,
+        gap,
+        directions=directions,
+        substitution=substitution,
+    )
+    return list(islice(paths, max_paths))
+
+
+def iter_optimal_paths(
+    matrix: Optional[List[List[int]]],
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    directions: Optional[np.ndarray] = None,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Lazily yield optimal alignments in the same order as trace_all_paths.
+
+    :param matrix: Scoring matrix from build_score_matrix (may be None when
+        directions is given)
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty
+    :param directions: Direction matrix from build_direction_matrix
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :return: Iterator over tuples of aligned strings
+    """
     n, m = len(seq1), len(seq2)
-    paths: List[Tuple[str, str]] = []
+    s1, s2 = seq1.sequence, seq2.sequence
+    if directions is not None:
+        flags = directions.item
+    else:
+        table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+        flags = _matrix_flags(matrix, a, b, table.scores, gap)
+
+    # Partial alignments are linked lists of (char1, char2, parent) nodes
+    # grown from the last column backwards, so branches share their suffix
+    # and walking a finished chain from (0, 0) yields the columns in order.
+    stack: List[Tuple[int, int, Optional[tuple]]] = [(n, m, None)]
+    while stack:
+        i, j, node = stack.pop()
+        if i == 0 and j == 0:
+            a1: List[str] = []
+            a2: List[str] = []
+            while node is not None:
+                char1, char2, node = node
+                a1.append(char1)
+                a2.append(char2)
+            yield "".join(a1), "".join(a2)
+            continue
+        found = flags(i, j)
+        # pushed in reverse so diagonal moves are explored first
+        if found & LEFT:
+            stack.append((i, j - 1, ("-", s2[j - 1], node)))
+        if found & UP:
+            stack.append((i - 1, j, (s1[i - 1], "-", node)))
+        if found & DIAG:
+            stack.append((i - 1, j - 1, (s1[i - 1], s2[j - 1], node)))
+
+
+def count_optimal_paths(
+    matrix: Optional[List[List[int]]],
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    directions: Optional[np.ndarray] = None,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> int:
+    """
+    Count all co-optimal alignments exactly, without enumerating them.
+
+    The number of optimal paths reaching a cell is the sum over the optimal
+    moves into it, accumulated row by row in Python ints, so the count is
+    exact however large it grows. Compare it with max_paths to tell whether
+    trace_all_paths truncated its output.
+
+    :param matrix: Scoring matrix from build_score_matrix (may be None when
+        directions is given)
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty
+    :param directions: Direction matrix from build_direction_matrix
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :return: Number of optimal global alignments
+    """
+    if directions is None:
+        table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+        directions = _directions_from_matrix(matrix, a, b, table.scores, gap)
+    last_row = deque(_path_count_rows(directions), maxlen=1)[0]
+    return last_row[-1]
+
+
+def optimal_path_counts(
+    matrix: Optional[List[List[int]]],
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    directions: Optional[np.ndarray] = None,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> List[List[int]]:
+    """
+    Return the number of optimal paths from the origin to every cell.
+
+    Unlike count_optimal_paths, which keeps one row at a time, the whole
+    table is returned: its last cell is the count of co-optimal alignments,
+    and it can be handed to sample_optimal_paths so the table is built once.
+
+    :param matrix: Scoring matrix from build_score_matrix (may be None when
+        directions is given)
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty
+    :param directions: Direction matrix from build_direction_matrix
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :return: (len(seq1) + 1) x (len(seq2) + 1) nested lists of path counts
+    """
+    if directions is None:
+        table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+        directions = _directions_from_matrix(matrix, a, b, table.scores, gap)
+    return list(_path_count_rows(directions))
+
+
+def sample_optimal_paths(
+    matrix: Optional[List[List[int]]],
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    k: int,
+    seed: Optional[int] = None,
+    directions: Optional[np.ndarray] = None,
+    substitution: Optional[SubstitutionMatrix] = None,
+    counts: Optional[List[List[int]]] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Draw k optimal alignments uniformly at random (with replacement).
+
+    Every cell stores how many optimal paths reach it from the origin.
+    Walking back from the last cell, each optimal move is taken with
+    probability proportional to the paths behind it, so every co-optimal
+    alignment is equally likely; each draw costs O(len(seq1) + len(seq2)).
+
+    :param matrix: Scoring matrix from build_score_matrix (may be None when
+        directions is given)
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty
+    :param k: Number of alignments to draw
+    :param seed: Seed for the random generator, for reproducible samples
+    :param directions: Direction matrix from build_direction_matrix
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :param counts: Path counts from optimal_path_counts for the same
+        alignment, to avoid rebuilding them
+    :return: List of k tuples of aligned strings
+    """
+    s1, s2 = seq1.sequence, seq2.sequence
+    if directions is None:
+        table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+        directions = _directions_from_matrix(matrix, a, b, table.scores, gap)
+    if counts is None:
+        counts = list(_path_count_rows(directions))
+    rng = random.Random(seed)
+    samples: List[Tuple[str, str]] = []
+    for _ in range(k):
+        i, j = len(s1), len(s2)
+        aligned1: List[str] = []
+        aligned2: List[str] = []
+        while i > 0 or j > 0:
+            found = directions.item(i, j)
+            pick = rng.randrange(counts[i][j])
+            if found & DIAG:
+                if pick < counts[i - 1][j - 1]:
+                    aligned1.append(s1[i - 1])
+                    aligned2.append(s2[j - 1])
+                    i -= 1
+                    j -= 1
+                    continue
+                pick -= counts[i - 1][j - 1]
+            if found & UP:
+                if pick < counts[i - 1][j]:
+                    aligned1.append(s1[i - 1])
+                    aligned2.append("-")
+                    i -= 1
+                    continue
+            aligned1.append("-")
+            aligned2.append(s2[j - 1])
+            j -= 1
+        aligned1.reverse()
+        aligned2.reverse()
+        samples.append(("".join(aligned1), "".join(aligned2)))
+    return samples
+
+
+def _path_count_rows(directions: np.ndarray) -> Iterator[List[int]]:
+    """
+    Yield, row by row, the number of optimal paths from the origin to each
+    cell of a direction matrix.
+    """
+    n, m = directions.shape[0] - 1, directions.shape[1] - 1
+    prev = [1] * (m + 1)
+    yield prev
+    for i in range(1, n + 1):
+        row = directions[i].tolist()
+        cur = [prev[0] if row[0] & UP else 0]
+        for j in range(1, m + 1):
+            found = row[j]
+            count = 0
+            if found & DIAG:
+                count += prev[j - 1]
+            if found & UP:
+                count += prev[j]
+            if found & LEFT:
+                count += cur[j - 1]
+            cur.append(count)
+        yield cur
+        prev = cur
+
+
+def _directions_from_matrix(
+    matrix, a: np.ndarray, b: np.ndarray, scores: np.ndarray, gap: int
+) -> np.ndarray:
+    """
+    Derive the direction matrix of a filled score matrix in bulk.
+    """
+    cells = np.asarray(matrix, dtype=np.int64).reshape(len(a) + 1, len(b) + 1)
+    sub = scores[np.ix_(a, b)]
+    directions = np.zeros(cells.shape, dtype=np.uint8)
+    diag = cells[1:, 1:] == cells[:-1, :-1] + sub
+    up = cells[1:, :] == cells[:-1, :] + gap
+    left = cells[:, 1:] == cells[:, :-1] + gap
+    directions[1:, 1:] |= diag.astype(np.uint8) * DIAG
+    directions[1:, :] |= up.astype(np.uint8) * UP
+    directions[:, 1:] |= left.astype(np.uint8) * LEFT
+    return directions
+
+
+def build_direction_matrix(
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+    min_score: Optional[int] = None,
+) -> Optional[np.ndarray]:
+    """
+    Fill the matrix row by row, recording only which moves are optimal.
+
+    Each cell of the returned uint8 array holds the DIAG, UP and LEFT flag
+    bits of the moves that reach it with its optimal score. Only two score
+    rows are alive during the fill, so tracing back from this matrix needs
+    one byte per cell instead of a full matrix of Python ints.
+
+    With min_score, the fill is abandoned as soon as the bound of
+    _score_bound shows the final score cannot reach it, as in score_only.
+
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :param min_score: Cutoff below which the pair is rejected
+    :return: A (len(seq1)+1) x (len(seq2)+1) uint8 matrix of flags, or None
+        when the score is below min_score
+    """
+    table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+    scores = table.scores
+    n, m = len(a), len(b)
+    directions = np.zeros((n + 1, m + 1), dtype=np.uint8)
+    directions[0, 1:] = LEFT
+    directions[1:, 0] = UP
+
+    ramp = np.arange(m + 1, dtype=np.int64) * gap
+    if min_score is not None:
+        left = np.arange(m, -1, -1, dtype=np.int64)
+        tail = left * gap
+        weight = max(table.max_score() - 2 * gap, 0)
+    prev = ramp.copy()
+    for i in range(1, n + 1):
+        sub = scores[a[i - 1]].take(b)
+        cur = _next_row(prev, sub, gap, ramp)
+        if (
+            min_score is not None
+            and i % _BOUND_ROWS == 0
+            and _score_bound(cur, n - i, left, tail, gap, weight) < min_score
+        ):
+            return None
+        row = directions[i, 1:]
+        row |= (cur[1:] == prev[:-1] + sub).astype(np.uint8) * DIAG
+        row |= (cur[1:] == prev[1:] + gap).astype(np.uint8) * UP
+        row |= (cur[1:] == cur[:-1] + gap).astype(np.uint8) * LEFT
+        prev = cur
+    if min_score is not None and prev[-1] < min_score:
+        return None
+    return directions
+
+
+def _next_row(
+    prev: np.ndarray, sub: np.ndarray, gap: int, ramp: np.ndarray
+) -> np.ndarray:
+    """
+    Compute row i of the matrix from row i-1, where sub holds the pair
+    scores of a[i-1] against every symbol of b.
+
+    Diagonal and vertical moves only need the previous row. The chain of
+    horizontal moves inside the row is resolved with a running maximum:
+    H[j] = max over k <= j of T[k] + (j - k) * gap, where ramp = j * gap.
+    """
+    cur = np.empty_like(prev)
+    cur[0] = prev[0] + gap
+    np.maximum(prev[:-1] + sub, prev[1:] + gap, out=cur[1:])
+    cur -= ramp
+    np.maximum.accumulate(cur, out=cur)
+    cur += ramp
+    return cur
+
+
+def _last_row(a: np.ndarray, b: np.ndarray, scores: np.ndarray, gap: int) -> np.ndarray:
+    """
+    Return the last row of the score matrix of a against b, keeping only
+    one row alive at a time.
+    """
+    ramp = np.arange(len(b) + 1, dtype=np.int64) * gap
+    row = ramp.copy()
+    for code in a:
+        row = _next_row(row, scores[code].take(b), gap, ramp)
+    return row
+
+
+def score_only(
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+    min_score: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Return the optimal global alignment score without building the matrix.
+
+    The shorter sequence is laid along the rows kept in memory, so only
+    O(min(len(seq1), len(seq2))) scores are alive at any time and no
+    traceback is performed. Scoring equivalent to edit distance (see
+    unit_cost) is computed bit-parallel by edit_distance instead.
+
+    With min_score, an upper bound on the final score is taken every
+    _BOUND_ROWS rows (see _score_bound) and the fill stops as soon as it
+    falls below the cutoff.
+
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :param min_score: Cutoff below which the pair is rejected
+    :return: The score of an optimal global alignment, or None when it is
+        below min_score
+    """
+    c = unit_cost(match, mismatch, gap, substitution)
+    if c is not None:
+        if substitution is not None:
+            match = substitution.match_mismatch[0]
+        # match * (n + m) / 2 - c * distance, kept exact in integers
+        total = match * (len(seq1) + len(seq2)) - 2 * c * edit_distance(seq1, seq2)
+        score = total // 2
+    else:
+        table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+        scores = table.scores
+        if len(b) > len(a):
+            # swapping the sequences transposes the pair scores as well
+            a, b, scores = b, a, scores.T
+        if min_score is None:
+            return int(_last_row(a, b, scores, gap)[-1])
+        score = _score_with_cutoff(a, b, scores, gap, table.max_score(), min_score)
+    if min_score is not None and (score is None or score < min_score):
+        return None
+    return score
+
+
+# Rows filled between two checks of the score bound: the check costs about
+# half a row, so taking it every few rows keeps accepted pairs nearly as
+# cheap as without a cutoff while delaying a rejection by at most this much.
+_BOUND_ROWS = 8
+
+
+def _score_with_cutoff(
+    a: np.ndarray,
+    b: np.ndarray,
+    scores: np.ndarray,
+    gap: int,
+    best: int,
+    min_score: int,
+) -> Optional[int]:
+    """
+    Fill a against b row by row like _last_row, returning None as soon as
+    no path can still reach min_score; best is the highest pair score.
+    """
+    n, m = len(a), len(b)
+    ramp = np.arange(m + 1, dtype=np.int64) * gap
+    left = np.arange(m, -1, -1, dtype=np.int64)  # columns still to cross
+    tail = left * gap
+    weight = max(best - 2 * gap, 0)
+    row = ramp.copy()
+    for i, code in enumerate(a, start=1):
+        row = _next_row(row, scores[code].take(b), gap, ramp)
+        if i % _BOUND_ROWS == 0 and (
+            _score_bound(row, n - i, left, tail, gap, weight) < min_score
+        ):
+            return None
+    return int(row[-1])
+
 
-    def recurse(i: int, j: int, a1: List[str], a2: List[str]):
+def _score_bound(
+    row: np.ndarray,
+    rows_left: int,
+    left: np.ndarray,
+    tail: np.ndarray,
+    gap: int,
+    weight: int,
+) -> int:
+    """
+    Return an upper bound on the final score given a completed row.
+
+    Every path crosses the row at some column j. From there, r rows and
+    s = left[j] columns remain; p aligned pairs and g gaps with 2p + g = r + s
+    score at most (r + s) * gap + p * (best - 2 * gap), which is largest at
+    p = min(r, s) (or p = 0 when pairs cannot beat two gaps). weight is
+    max(best - 2 * gap, 0) and tail is left * gap.
+    """
+    reach = row + tail
+    if weight:
+        reach += weight * np.minimum(left, rows_left)
+    return int(reach.max()) + rows_left * gap
+
+
+def unit_cost(
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> Optional[int]:
+    """
+    Return c > 0 when the scoring ranks global alignments like unit-cost
+    edit distance, otherwise None.
+
+    An alignment of n + m symbols with p aligned pairs and g gaps has
+    2p + g = n + m, so it scores match * (n + m) / 2 - c * (X + g) with X
+    mismatches whenever mismatch - match = gap - match / 2 = -c: maximising
+    the score minimises the edit count X + g. match=0, mismatch=-1, gap=-1
+    is the plain case, and e.g. match=2, mismatch=-1, gap=-2 is another.
+
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty
+    :param substitution: Substitution matrix; only uniform tables qualify
+    :return: The cost c of one edit, or None
+    """
+    if substitution is not None:
+        if substitution.match_mismatch is None:
+            return None
+        match, mismatch = substitution.match_mismatch
+    c = match - mismatch
+    if c > 0 and 2 * c == match - 2 * gap:
+        return c
+    return None
+
+
+def edit_distance(seq1: Sequence, seq2: Sequence) -> int:
+    """
+    Return the unit-cost (Levenshtein) distance between two sequences.
+
+    Uses Myers' bit-vector algorithm in Hyyrö's global form: the vertical
+    score deltas of a whole column are packed into Python integers, so each
+    column costs a handful of big-integer operations, O(len / w) machine
+    words each. The longer sequence is the one packed into bits, which
+    keeps the interpreter loop over the shorter one.
+
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :return: The minimum number of substitutions, insertions and deletions
+    """
+    pattern, text = seq1.codes, seq2.codes
+    if len(text) > len(pattern):
+        pattern, text = text, pattern
+    m = len(pattern)
+    if m == 0:
+        return 0
+    # peq[c] has bit i set where pattern[i] == c
+    peq = {}
+    for code in np.unique(pattern):
+        bits = np.packbits(pattern == code, bitorder="little")
+        peq[code] = int.from_bytes(bits.tobytes(), "little")
+    mask = (1 << m) - 1
+    top = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for code in text.tolist():
+        eq = peq.get(code, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & top:
+            score += 1
+        elif mh & top:
+            score -= 1
+        # the boundary row D[0][j] = j grows by one per column
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+# Cells of the lane block a QueryProfile fills per step, bounding the
+# number of targets scored together.
+_PROFILE_LANE_CELLS = 1 << 20
+
+
+class QueryProfile:
+    """
+    A query precomputed for scoring against many targets.
+
+    For every target symbol the profile holds the vector of its pair scores
+    against each query position, so filling a row is an addition of that
+    vector and needs no per-cell lookup. Targets are scored in lanes: a
+    block of targets is filled together, one row of every target per
+    step, so the per-step interpreter overhead is shared across the block.
+    """
+
+    def __init__(
+        self,
+        query: Sequence,
+        match: int,
+        mismatch: int,
+        gap: int,
+        substitution: Optional[SubstitutionMatrix] = None,
+    ):
         """
-        Recursive function to find all paths in the scoring matrix.
-        :param i: Current row index
-        :param j: Current column index
-        :param a1: Current alignment for seq1
-        :param a2: Current alignment for seq2
+        :param query: Query sequence (aligned as seq1)
+        :param match: Score for a match
+        :param mismatch: Score for a mismatch
+        :param gap: Gap penalty
+        :param substitution: Substitution matrix scoring aligned pairs in
+            place of match/mismatch
         """
-        if len(paths) >= max_paths:
-            return
-        if i == 0 and j == 0:
-            paths.append(("".join(reversed(a1)), "".join(reversed(a2))))
+        self.query = query
+        self.gap = gap
+        self.table = resolve_scoring(substitution, match, mismatch)
+        self._query = self.table.encode(query.data)
+        # profile rows are built for the target symbols actually seen;
+        # _rows maps a code to its row, or -1
+        self._rows = np.full(len(self.table.scores), -1, dtype=np.intp)
+        self.profile = np.empty((0, len(self._query)), dtype=np.int64)
+        self._ramp = np.arange(len(self._query) + 1, dtype=np.int64) * gap
+
+    def _profile_rows(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Return the profile row of every code, adding the missing rows.
+        Codes are bytes, so there are at most 256 rows.
+        """
+        symbols = np.unique(codes)
+        missing = symbols[self._rows[symbols] < 0]
+        if len(missing):
+            self._rows[missing] = np.arange(len(missing)) + len(self.profile)
+            # scores[query, symbol]: the query is aligned as seq1
+            added = self.table.scores[:, missing].T.take(self._query, axis=1)
+            self.profile = np.concatenate([self.profile, added])
+        return self._rows[codes]
+
+    def score(self, target: Sequence) -> int:
+        """
+        Return the optimal global alignment score of the query against
+        target, as score_only(query, target, ...) would.
+        """
+        return self.score_many([target])[0]
+
+    def score_many(self, targets: List[Sequence]) -> List[int]:
+        """
+        Return the optimal global alignment scores of the query against
+        each of targets, in order.
+        """
+        lanes = max(1, _PROFILE_LANE_CELLS // (len(self._query) + 1))
+        # longest first, so the targets still being filled are a prefix
+        order = sorted(range(len(targets)), key=lambda k: -len(targets[k]))
+        scores = [0] * len(targets)
+        for start in range(0, len(order), lanes):
+            block = [targets[k] for k in order[start : start + lanes]]
+            for k, value in zip(order[start : start + lanes], self._fill(block)):
+                scores[k] = value
+        return scores
+
+    def _fill(self, block: List[Sequence]) -> List[int]:
+        """
+        Score a block of targets sorted by decreasing length.
+        """
+        width = len(self._query) + 1
+        lengths = [len(target) for target in block]
+        # the profile-row indices of every target back to back, one byte
+        # each and unpadded, so a long target costs only its own length;
+        # row i of target k is at offsets[k] + i
+        offsets = np.zeros(len(block), dtype=np.intp)
+        np.cumsum(lengths[:-1], out=offsets[1:])
+        rows = np.empty(sum(lengths), dtype=np.uint8)
+        for k, target in enumerate(block):
+            if lengths[k]:
+                rows[offsets[k] : offsets[k] + lengths[k]] = self._profile_rows(
+                    self.table.encode(target.data)
+                )
+        gap, ramp = self.gap, self._ramp
+        prev = np.tile(ramp, (len(block), 1))
+        cur = np.empty_like(prev)
+        diag = np.empty((len(block), width - 1), dtype=np.int64)
+        # empty targets score the all-gap row
+        results = [int(ramp[-1])] * len(block)
+        active = len(block)
+        for i in range(lengths[0]):
+            while lengths[active - 1] <= i:
+                active -= 1
+            p, c, d = prev[:active], cur[:active], diag[:active]
+            self.profile.take(rows[offsets[:active] + i], axis=0, out=d)
+            d += p[:, :-1]
+            np.add(p[:, 1:], gap, out=c[:, 1:])
+            np.maximum(d, c[:, 1:], out=c[:, 1:])
+            c[:, 0] = p[:, 0] + gap
+            c -= ramp
+            np.maximum.accumulate(c, axis=1, out=c)
+            c += ramp
+            for k in range(active - 1, -1, -1):
+                if lengths[k] != i + 1:
+                    break
+                results[k] = int(c[k, -1])
+            prev, cur = cur, prev
+        return results
+
+
+class IncrementalAligner:
+    """
+    A global alignment that is updated in place as its sequences change.
+
+    The score matrix is kept (with spare capacity for growth) together with
+    the encoded sequences. When a sequence is replaced, only the cells that
+    depend on changed symbols are refilled: rows after the common prefix of
+    the old and new seq1, and columns after the common prefix of the old
+    and new seq2. Appending k symbols to seq1 therefore costs k rows, and
+    an edit at position p of seq1 costs the rows from p onward.
+    """
+
+    def __init__(
+        self,
+        seq1: Sequence,
+        seq2: Sequence,
+        match: int,
+        mismatch: int,
+        gap: int,
+        substitution: Optional[SubstitutionMatrix] = None,
+    ):
+        """
+        :param seq1: First sequence
+        :param seq2: Second sequence
+        :param match: Score for a match
+        :param mismatch: Score for a mismatch
+        :param gap: Gap penalty
+        :param substitution: Substitution matrix scoring aligned pairs in
+            place of match/mismatch
+        """
+        self.table, self._a, self._b = _encode_pair(
+            seq1, seq2, match, mismatch, substitution
+        )
+        self.seq1, self.seq2 = seq1, seq2
+        self.gap = gap
+        self._cells = np.empty((0, 0), dtype=np.int64)
+        self._refill(0, 0)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        The current (len(seq1)+1) x (len(seq2)+1) score matrix (a view).
+        """
+        return self._cells[: len(self._a) + 1, : len(self._b) + 1]
+
+    @property
+    def score(self) -> int:
+        """
+        The optimal global alignment score of the current sequences.
+        """
+        return int(self._cells[len(self._a), len(self._b)])
+
+    def update(
+        self, seq1: Optional[Sequence] = None, seq2: Optional[Sequence] = None
+    ) -> int:
+        """
+        Replace one or both sequences and refill only what they invalidate.
+
+        :param seq1: New first sequence (unchanged when None)
+        :param seq2: New second sequence (unchanged when None)
+        :return: Number of cells recomputed
+        """
+        row = col = None
+        if seq1 is not None:
+            a = self.table.encode(seq1.data)
+            row = _common_prefix(self._a, a)
+            self.seq1, self._a = seq1, a
+        if seq2 is not None:
+            b = self.table.encode(seq2.data)
+            col = _common_prefix(self._b, b)
+            self.seq2, self._b = seq2, b
+        n, m = len(self._a), len(self._b)
+        row = n if row is None else row
+        col = m if col is None else col
+        self._refill(row, col)
+        # rows after row are refilled whole; earlier rows only after col
+        return (n - row) * m + row * (m - col)
+
+    def extend(self, suffix1: str = "", suffix2: str = "") -> int:
+        """
+        Append symbols to seq1 and/or seq2, filling only the new cells.
+
+        :param suffix1: Symbols appended to seq1
+        :param suffix2: Symbols appended to seq2
+        :return: Number of cells computed
+        """
+        seq1 = seq2 = None
+        if suffix1:
+            seq1 = Sequence(
+                self.seq1.id, self.seq1.data + suffix1.encode(), self.seq1.alphabet
+            )
+        if suffix2:
+            seq2 = Sequence(
+                self.seq2.id, self.seq2.data + suffix2.encode(), self.seq2.alphabet
+            )
+        return self.update(seq1, seq2)
+
+    def traceback(self) -> Tuple[str, str]:
+        """
+        Recover one optimal alignment of the current sequences, as traceback
+        would from a freshly built matrix.
+
+        :return: A tuple of aligned strings (with '-' for gaps)
+        """
+        flags = _matrix_flags(
+            self.matrix, self._a, self._b, self.table.scores, self.gap
+        )
+        return _traceback(flags, self.seq1.sequence, self.seq2.sequence)
+
+    def _reserve(self, n: int, m: int) -> None:
+        rows, cols = self._cells.shape
+        if n < rows and m < cols:
             return
-        if i > 0 and j > 0:
-            char1 = seq1.sequence[i - 1]
-            char2 = seq2.sequence[j - 1]
-            score_diag = matrix[i - 1][j - 1] + (match if char1 == char2 else mismatch)
-            if matrix[i][j] == score_diag:
-                recurse(i - 1, j - 1, a1 + [char1], a2 + [char2])
-        if i > 0 and matrix[i][j] == matrix[i - 1][j] + gap:
-            recurse(i - 1, j, a1 + [seq1.sequence[i - 1]], a2 + ["-"])
-        if j > 0 and matrix[i][j] == matrix[i][j - 1] + gap:
-            recurse(i, j - 1, a1 + ["-"], a2 + [seq2.sequence[j - 1]])
-
-    recurse(n, m, [], [])
-    return paths
+        # grow each axis geometrically, and only when it overflows, so
+        # repeated appends stay amortised O(change) without inflating the
+        # axis of a sequence that does not grow
+        rows_new = max(n + 1, 2 * rows) if n >= rows else rows
+        cols_new = max(m + 1, 2 * cols) if m >= cols else cols
+        grown = np.empty((rows_new, cols_new), dtype=np.int64)
+        grown[:rows, :cols] = self._cells
+        self._cells = grown
+
+    def _refill(self, row: int, col: int) -> None:
+        """
+        Recompute rows row+1.. entirely and, above them, columns col+1..;
+        row and col are the lengths of the unchanged prefixes.
+        """
+        a, b, scores, gap = self._a, self._b, self.table.scores, self.gap
+        n, m = len(a), len(b)
+        self._reserve(n, m)
+        cells = self._cells
+        ramp = np.arange(m + 1, dtype=np.int64) * gap
+        cells[0, col : m + 1] = ramp[col:]
+        if col < m:
+            # new columns of the kept rows: the left boundary is cells[i, col]
+            strip = ramp[: m - col + 1]
+            for i in range(1, min(row, n) + 1):
+                prev = cells[i - 1, col : m + 1]
+                cur = cells[i, col : m + 1]
+                sub = scores[a[i - 1]].take(b[col:m])
+                np.maximum(prev[:-1] + sub, prev[1:] + gap, out=cur[1:])
+                cur -= strip
+                np.maximum.accumulate(cur, out=cur)
+                cur += strip
+        for i in range(row + 1, n + 1):
+            sub = scores[a[i - 1]].take(b)
+            cells[i, : m + 1] = _next_row(cells[i - 1, : m + 1], sub, gap, ramp)
+        cells[row + 1 : n + 1, 0] = np.arange(row + 1, n + 1) * gap
+
+
+def _common_prefix(old: np.ndarray, new: np.ndarray) -> int:
+    """
+    Return the length of the common prefix of two code arrays.
+    """
+    k = min(len(old), len(new))
+    differ = np.flatnonzero(old[:k] != new[:k])
+    return int(differ[0]) if len(differ) else k
+
+
+# Score for cells outside a band; low enough to never win a max, high
+# enough that adding penalties to it cannot overflow int64.
+_NEG = -(2**60)
+
+
+class _BandRow:
+    """
+    One stored band row, indexed by matrix column.
+    """
+
+    __slots__ = ("values", "offset")
+
+    def __init__(self, values: np.ndarray, offset: int):
+        self.values = values
+        self.offset = offset
+
+    def __getitem__(self, j: int) -> int:
+        idx = j - self.offset
+        if 0 <= idx < len(self.values):
+            return int(self.values[idx])
+        return _NEG
+
+
+class _BandedMatrix:
+    """
+    Read-only matrix view over band storage so that _traceback can walk it
+    like a full matrix; cells outside the band read as _NEG.
+    """
+
+    def __init__(self, rows: np.ndarray, lo: int):
+        self.rows = rows
+        self.lo = lo
+
+    def __getitem__(self, i: int) -> _BandRow:
+        return _BandRow(self.rows[i], i + self.lo)
+
+
+def _banded_fill(
+    a: np.ndarray,
+    b: np.ndarray,
+    scores: np.ndarray,
+    gap: int,
+    lo: int,
+    hi: int,
+) -> np.ndarray:
+    """
+    Fill only cells with lo <= j - i <= hi.
+
+    Row i is stored at rows[i, j - i - lo]; the extra last column stays
+    _NEG so the vertical neighbour of the rightmost cell is always defined.
+    """
+    n, m = len(a), len(b)
+    width = hi - lo + 1
+    rows = np.full((n + 1, width + 1), _NEG, dtype=np.int64)
+    ramp = np.arange(width, dtype=np.int64) * gap
+
+    jhi = min(m, hi)
+    rows[0, -lo : jhi - lo + 1] = ramp[: jhi + 1]
+    for i in range(1, n + 1):
+        prev = rows[i - 1]
+        jlo = max(0, i + lo)
+        jhi = min(m, i + hi)
+        x0 = jlo - i - lo
+        x1 = jhi - i - lo + 1
+        cur = prev[x0 + 1 : x1 + 1] + gap
+        start = 1 if jlo == 0 else 0
+        sub = scores[a[i - 1]].take(b[jlo + start - 1 : jhi])
+        np.maximum(cur[start:], prev[x0 + start : x1] + sub, out=cur[start:])
+        cur -= ramp[: x1 - x0]
+        np.maximum.accumulate(cur, out=cur)
+        cur += ramp[: x1 - x0]
+        rows[i, x0:x1] = cur
+    return rows
+
+
+def _band_is_optimal(
+    score: int, n: int, m: int, best: int, gap: int, lo: int, hi: int
+) -> bool:
+    """
+    Check that no path leaving the band [lo, hi] can beat score, where best
+    is the highest score of any aligned pair.
+
+    A path reaching diagonal offset o uses at least |o| + |o - (m - n)| gaps,
+    and an alignment with g gaps scores at most g * gap + (n + m - g) / 2 *
+    best. That bound is linear in g, so it peaks at the fewest or the most
+    (n + m) gaps.
+    """
+    diff = m - n
+    for offset in (lo - 1, hi + 1):
+        if offset < -n or offset > m:
+            continue
+        for gaps in (abs(offset) + abs(offset - diff), n + m):
+            if 2 * gaps * gap + (n + m - gaps) * best > 2 * score:
+                return False
+    return True
+
+
+def banded_align(
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    band: int = 16,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> Tuple[str, str]:
+    """
+    Recover one optimal global alignment filling only a diagonal band.
+
+    Cells within band of the diagonals between 0 and len(seq2) - len(seq1)
+    are filled and stored. The band is doubled until an upper bound on every
+    path that leaves it proves the banded score optimal, so the result is
+    always exact; for similar sequences the work is O(n * band). With
+    scoring equivalent to edit distance the band is instead sized from the
+    bit-parallel edit_distance, so a single fill suffices.
+
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty
+    :param band: Initial band half-width
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :return: A tuple of aligned strings (with '-' for gaps)
+    """
+    s1, s2 = seq1.sequence, seq2.sequence
+    table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+    n, m = len(a), len(b)
+    k = max(band, 0)
+    if unit_cost(match, mismatch, gap, substitution) is not None:
+        # an alignment with d edits leaves the diagonals between 0 and m - n
+        # by at most (d - |m - n|) / 2, so this band is proven on first fill
+        k = (edit_distance(seq1, seq2) - abs(m - n)) // 2
+    while True:
+        lo = min(0, m - n) - k
+        hi = max(0, m - n) + k
+        rows = _banded_fill(a, b, table.scores, gap, lo, hi)
+        score = int(rows[n, m - n - lo])
+        if (lo <= -n and hi >= m) or _band_is_optimal(
+            score, n, m, table.max_score(), gap, lo, hi
+        ):
+            break
+        k = max(1, 2 * k)
+    flags = _matrix_flags(_BandedMatrix(rows, lo), a, b, table.scores, gap)
+    return _traceback(flags, s1, s2)
+
+
+def hirschberg(
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> Tuple[str, str]:
+    """
+    Recover one optimal global alignment in linear space (Hirschberg).
+
+    seq1 is split in half; the forward scores of the top half and the
+    reverse scores of the bottom half locate the column where an optimal
+    path crosses the middle row, and both halves are solved recursively.
+    Only O(len(seq1) + len(seq2)) scores are kept at any time. The score
+    equals that of traceback, but on ties a different co-optimal
+    alignment may be returned.
+
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap: Gap penalty
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :return: A tuple of aligned strings (with '-' for gaps)
+    """
+    table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+    pieces1: List[str] = []
+    pieces2: List[str] = []
+    _hirschberg(seq1.sequence, seq2.sequence, a, b, table.scores, gap, pieces1, pieces2)
+    return "".join(pieces1), "".join(pieces2)
+
+
+# Subproblems at or below this many cells are solved with a full matrix.
+_HIRSCHBERG_BASE_CELLS = 4096
+
+
+def _hirschberg(
+    s1: str,
+    s2: str,
+    a: np.ndarray,
+    b: np.ndarray,
+    scores: np.ndarray,
+    gap: int,
+    pieces1: List[str],
+    pieces2: List[str],
+) -> None:
+    n, m = len(s1), len(s2)
+    if n <= 1 or m <= 1 or (n + 1) * (m + 1) <= _HIRSCHBERG_BASE_CELLS:
+        matrix = _fill_python(a, b, scores, gap)
+        flags = _matrix_flags(matrix, a, b, scores, gap)
+        aln1, aln2 = _traceback(flags, s1, s2)
+        pieces1.append(aln1)
+        pieces2.append(aln2)
+        return
+
+    mid = n // 2
+    forward = _last_row(a[:mid], b, scores, gap)
+    backward = _last_row(a[mid:][::-1], b[::-1], scores, gap)
+    split = int(np.argmax(forward + backward[::-1]))
+
+    _hirschberg(
+        s1[:mid],
+        s2[:split],
+        a[:mid],
+        b[:split],
+        scores,
+        gap,
+        pieces1,
+        pieces2,
+    )
+    _hirschberg(
+        s1[mid:],
+        s2[split:],
+        a[mid:],
+        b[split:],
+        scores,
+        gap,
+        pieces1,
+        pieces2,
+    )
+
+
+def build_affine_matrices(
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap_open: int,
+    gap_extend: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fill the three Gotoh matrices for affine gap scoring.
+
+    A gap of length L scores gap_open + (L - 1) * gap_extend, so
+    gap_open == gap_extend reproduces linear scoring. M holds the best score
+    of alignments ending in an aligned pair, X of those ending with a gap in
+    seq2 and Y of those ending with a gap in seq1. Every cell depends only
+    on the two previous anti-diagonals, so each diagonal of all three
+    matrices is updated with whole-array operations, as in the numpy engine.
+
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap_open: Score of the first position of a gap
+    :param gap_extend: Score of every further position of a gap
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :return: The (M, X, Y) int64 matrices, each (len(seq1)+1) x (len(seq2)+1)
+    """
+    table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+    scores = table.scores
+    n, m = len(a), len(b)
+    M = np.full((n + 1, m + 1), _NEG, dtype=np.int64)
+    X = np.full((n + 1, m + 1), _NEG, dtype=np.int64)
+    Y = np.full((n + 1, m + 1), _NEG, dtype=np.int64)
+    M[0, 0] = 0
+    X[1:, 0] = gap_open + np.arange(n, dtype=np.int64) * gap_extend
+    Y[0, 1:] = gap_open + np.arange(m, dtype=np.int64) * gap_extend
+    if n == 0 or m == 0:
+        return M, X, Y
+
+    fm, fx, fy = M.reshape(-1), X.reshape(-1), Y.reshape(-1)
+    for d in range(2, n + m + 1):
+        lo = max(1, d - m)
+        hi = min(n, d - 1)
+        # same strided layout as _fill_antidiagonal
+        start = lo * m + d
+        stop = start + (hi - lo) * m + 1
+        dg = slice(start - m - 2, stop - m - 2, m)
+        up = slice(start - m - 1, stop - m - 1, m)
+        left = slice(start - 1, stop - 1, m)
+        here = slice(start, stop, m)
+
+        rev = b[d - hi - 1 : d - lo][::-1]
+        sub = scores[a[lo - 1 : hi], rev]
+        fm[here] = np.maximum(np.maximum(fm[dg], fx[dg]), fy[dg]) + sub
+        fx[here] = np.maximum(
+            np.maximum(fm[up], fy[up]) + gap_open, fx[up] + gap_extend
+        )
+        fy[here] = np.maximum(
+            np.maximum(fm[left], fx[left]) + gap_open, fy[left] + gap_extend
+        )
+    return M, X, Y
+
+
+def affine_traceback(
+    matrices: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    seq1: Sequence,
+    seq2: Sequence,
+    match: int,
+    mismatch: int,
+    gap_open: int,
+    gap_extend: int,
+    substitution: Optional[SubstitutionMatrix] = None,
+) -> Tuple[str, str]:
+    """
+    Recover one optimal alignment from the Gotoh matrices.
+
+    The walk starts in the best of the three states at the last cell and,
+    at every step, moves to the first of M, X, Y (in that order) that
+    explains the current score.
+
+    :param matrices: (M, X, Y) from build_affine_matrices
+    :param seq1: First sequence
+    :param seq2: Second sequence
+    :param match: Score for a match
+    :param mismatch: Score for a mismatch
+    :param gap_open: Score of the first position of a gap
+    :param gap_extend: Score of every further position of a gap
+    :param substitution: Substitution matrix scoring aligned pairs in place
+        of match/mismatch
+    :return: A tuple of aligned strings (with '-' for gaps)
+    """
+    s1, s2 = seq1.sequence, seq2.sequence
+    table, a, b = _encode_pair(seq1, seq2, match, mismatch, substitution)
+    codes1, codes2 = a.tolist(), b.tolist()
+    pair = table.scores.item
+    states = [mat.item for mat in matrices]
+    i, j = len(s1), len(s2)
+    final = [get(i, j) for get in states]
+    state = final.index(max(final))
+    aligned1: List[str] = []
+    aligned2: List[str] = []
+
+    while i > 0 or j > 0:
+        here = states[state](i, j)
+        if state == 0:
+            sub = pair(codes1[i - 1], codes2[j - 1])
+            aligned1.append(s1[i - 1])
+            aligned2.append(s2[j - 1])
+            i -= 1
+            j -= 1
+            moves = (sub, sub, sub)
+        elif state == 1:
+            aligned1.append(s1[i - 1])
+            aligned2.append("-")
+            i -= 1
+            moves = (gap_open, gap_extend, gap_open)
+        else:
+            aligned1.append("-")
+            aligned2.append(s2[j - 1])
+            j -= 1
+            moves = (gap_open, gap_open, gap_extend)
+        for prev in range(3):
+            if states[prev](i, j) + moves[prev] == here:
+                state = prev
+                break
+
+    aligned1.reverse()
+    aligned2.reverse()
+    return "".join(aligned1), "".join(aligned2)
@@ -1,6 +1,6 @@
 from typing import List, Dict, Optional
 from jinja2 import Template
-from aligner.models import Sequence
+from aligner.models import AlignmentResult, Sequence
 
 _HTML_TEMPLATE = """<!DOCTYPE html>
 <html>
@@ -20,7 +20,13 @@ _HTML_TEMPLATE = """<!DOCTYPE html>
   <ul>
     <li>Match: {{ parameters.match }}</li>
     <li>Mismatch: {{ parameters.mismatch }}</li>
+    {% if parameters.substitution_matrix is defined %}
+    <li>Substitution matrix: {{ parameters.substitution_matrix }}</li>
+    {% endif %}
     <li>Gap penalty: {{ parameters.gap }}</li>
+    {% if parameters.gap_extend is defined %}
+    <li>Gap extend: {{ parameters.gap_extend }}</li>
+    {% endif %}
   </ul>
   <h2>Sequences</h2>
   <pre>>
@@ -49,12 +55,14 @@ Sequence 2: {{ seq2_id }}: {{ seq2_seq }}</pre>
 def format_html_report(
     seq1: Sequence,
     seq2: Sequence,
-    alignments: List[Dict],
+    alignments: List[AlignmentResult],
     parameters: Dict,
     image_path: Optional[str] = None,
 ) -> str:
     """
     Render an HTML summary report.
+    The template reads the alignment fields by name, so the records of
+    create_output_dict render the same as AlignmentResult objects.
     """
     tmpl = Template(_HTML_TEMPLATE)
     return tmpl.render(
@@ -1,7 +1,111 @@
-import csv
+import gzip
 import json
-from typing import Dict, List, Tuple
-from aligner.models import Sequence
+import mmap
+import os
+import numpy as np
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from aligner.models import AlignmentResult, Sequence, as_result
+
+# Bytes that may appear inside the sequence lines of a record.
+_FASTA_WHITESPACE = b" \t\r\n"
+
+# Read size for compressed input, which cannot be memory-mapped.
+_GZIP_CHUNK = 1 << 20
+
+
+def iter_fasta(path: str, alphabet: str = "dna") -> Iterator[Sequence]:
+    """
+    Lazily yield the records of a FASTA file, one Sequence at a time.
+    Plain files are memory-mapped and split at each "\n>", so a record's
+    sequence lines are joined by one bytes.translate pass over its block
+    instead of one Python string per line; only the current record is held
+    in memory. Gzip-compressed files (detected by their magic bytes) are
+    decompressed in chunks with the same record splitting.
+    Parameters
+    ----------
+    path : str
+        Path to the FASTA file, optionally gzip-compressed.
+    alphabet : str
+        The alphabet used for the sequences (default is "dna").
+    Returns
+    -------
+    Iterator[Sequence]
+        The records in file order.
+    Raises
+    ------
+    ValueError
+        If there is sequence data before the first header.
+    """
+    with open(path, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+        f.seek(0)
+        if compressed:
+            with gzip.open(f) as stream:
+                blocks = _split_stream(stream)
+                yield from _parse_blocks(blocks, path, alphabet)
+            return
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from _parse_blocks(_split_mapped(mm), path, alphabet)
+
+
+def _split_mapped(mm: mmap.mmap) -> Iterator[bytes]:
+    """
+    Yield the raw text of each record of a mapped file, leading ">" included.
+    """
+    size = len(mm)
+    start = 0
+    while start < size and mm[start : start + 1] in b" \t\r\n":
+        start += 1
+    while start < size:
+        end = mm.find(b"\n>", start)
+        end = size if end < 0 else end + 1
+        yield mm[start:end]
+        start = end
+
+
+def _split_stream(stream) -> Iterator[bytes]:
+    """
+    Yield the raw text of each record read from a binary stream.
+    """
+    pending = bytearray()
+    started = False
+    scan = 0
+    for chunk in iter(lambda: stream.read(_GZIP_CHUNK), b""):
+        pending += chunk
+        if not started:
+            del pending[: len(pending) - len(pending.lstrip())]
+            if not pending:
+                continue
+            started = True
+        start = 0
+        while True:
+            end = pending.find(b"\n>", max(scan, start))
+            if end < 0:
+                break
+            yield bytes(pending[start : end + 1])
+            start = end + 1
+        # drop the emitted records once per chunk, and resume the search
+        # just before the end so a "\n>" split across chunks is still found
+        del pending[:start]
+        scan = max(len(pending) - 1, 0)
+    if pending:
+        yield bytes(pending)
+
+
+def _parse_blocks(
+    blocks: Iterable[bytes], path: str, alphabet: str
+) -> Iterator[Sequence]:
+    for block in blocks:
+        if not block.startswith(b">"):
+            raise ValueError("FASTA format error: data before header")
+        newline = block.find(b"\n")
+        if newline < 0:
+            newline = len(block)
+        header = block[1:newline].decode().strip()
+        residues = block[newline + 1 :].translate(None, _FASTA_WHITESPACE)
+        yield Sequence(header, residues, alphabet)
 
 
 def read_fasta(path: str, alphabet: str = "dna") -> list[Sequence]:
@@ -12,10 +116,11 @@ def read_fasta(path: str, alphabet: str = "dna") -> list[Sequence]:
     - sequence: The sequence string (all lines after the header line).
     - alphabet: The alphabet used for the sequence (e.g., "dna", "protein").
     The function raises a ValueError if the file is empty or if there are no valid sequences.
+    Use iter_fasta to stream the records of large files instead.
     Parameters
     ----------
     path : str
-        Path to the FASTA file.
+        Path to the FASTA file, optionally gzip-compressed.
     alphabet : str
         The alphabet used for the sequence (default is "dna").
     Returns
@@ -27,34 +132,211 @@ def read_fasta(path: str, alphabet: str = "dna") -> list[Sequence]:
     ValueError
         If the file is empty or if there are no valid sequences.
     """
-    sequences = []
-    header = None
-    seq_lines: list[str] = []
-    with open(path) as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            if line.startswith(">"):
-                if header is not None:
-                    seq_str = "".join(seq_lines)
-                    # pass the raw string, not len(seq_str)
-                    sequences.append(Sequence(header, seq_str, alphabet))
-                header = line[1:].strip()
-                seq_lines = []
-            else:
-                if header is None:
-                    raise ValueError("FASTA format error: data before header")
-                seq_lines.append(line)
-        if header is not None:
-            seq_str = "".join(seq_lines)
-            sequences.append(Sequence(header, seq_str, alphabet))
+    sequences = list(iter_fasta(path, alphabet))
     if not sequences:
         raise ValueError(f"No sequences found in FASTA file: {path}")
 
     return sequences
 
 
+class FaiEntry(NamedTuple):
+    """
+    One line of a samtools-compatible .fai index.
+    """
+
+    name: str
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+
+def index_fasta(path: str) -> Dict[str, FaiEntry]:
+    """
+    Scan a FASTA file and write its samtools-compatible index to path.fai.
+    Records are named by the first word of their header. Within a record
+    every line but the last must hold the same number of bases, which is
+    what makes each base addressable by arithmetic alone.
+    Parameters
+    ----------
+    path : str
+        Path to an uncompressed FASTA file.
+    Returns
+    -------
+    dict[str, FaiEntry]
+        The index entries by record name, in file order.
+    Raises
+    ------
+    ValueError
+        If the file is compressed, has data before the first header,
+        repeats a record name or has a record with uneven line lengths.
+    """
+    entries: Dict[str, FaiEntry] = {}
+    with open(path, "rb") as f:
+        if f.read(2) == b"\x1f\x8b":
+            raise ValueError(f"Cannot index compressed FASTA file: {path}")
+        if os.fstat(f.fileno()).st_size:
+            # searches run on the mmap; line lengths are measured on a
+            # separate NumPy mapping that is released when dropped
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for entry in _index_records(mm, data, path):
+                    if entry.name in entries:
+                        raise ValueError(f"Duplicate record {entry.name!r} in {path}")
+                    entries[entry.name] = entry
+    try:
+        with open(path + ".fai", "w") as f:
+            for entry in entries.values():
+                f.write("\t".join(str(field) for field in entry) + "\n")
+    except OSError:
+        pass  # a read-only location only costs a rescan next time
+    return entries
+
+
+def _index_records(mm: mmap.mmap, data: np.ndarray, path: str) -> Iterator[FaiEntry]:
+    size = len(mm)
+    start = 0
+    while start < size and mm[start : start + 1] in b" \t\r\n":
+        start += 1
+    while start < size:
+        if mm[start : start + 1] != b">":
+            raise ValueError("FASTA format error: data before header")
+        eol = mm.find(b"\n", start)
+        seq_start = size if eol < 0 else eol + 1
+        header = mm[start + 1 : seq_start].decode().split()
+        name = header[0] if header else ""
+        end = mm.find(b"\n>", start)
+        end = size if end < 0 else end + 1
+        yield _index_lines(name, data[seq_start:end], seq_start, path)
+        start = end
+
+
+def _index_lines(name: str, block: np.ndarray, offset: int, path: str) -> FaiEntry:
+    """
+    Measure the sequence lines of one record from its newline positions.
+    """
+    ends = np.flatnonzero(block == ord("\n"))
+    starts = np.concatenate(([0], ends + 1))
+    if starts[-1] < len(block):
+        ends = np.append(ends, len(block))  # last line lacks a newline
+    else:
+        starts = starts[:-1]
+    crlf = len(ends) > 0 and ends[0] > 0 and block[ends[0] - 1] == ord("\r")
+    eol = 2 if crlf else 1
+    bases = ends - starts - (block[np.maximum(ends - 1, 0)] == ord("\r"))
+    # blank lines are only allowed after the last sequence line
+    filled = np.flatnonzero(bases)
+    bases = bases[: filled[-1] + 1] if len(filled) else bases[:0]
+    if not len(bases):
+        return FaiEntry(name, 0, offset, 0, 0)
+    width = int(bases[0])
+    if (bases[:-1] != width).any() or bases[-1] > width:
+        raise ValueError(
+            f"Cannot index {path}: record {name!r} has lines of different lengths"
+        )
+    return FaiEntry(name, int(bases.sum()), offset, width, width + eol)
+
+
+def load_fasta_index(path: str) -> Dict[str, FaiEntry]:
+    """
+    Return the index of a FASTA file, reading path.fai when it is at least
+    as new as the FASTA file and (re)building it otherwise.
+    """
+    fai = path + ".fai"
+    if not os.path.exists(fai) or os.path.getmtime(fai) < os.path.getmtime(path):
+        return index_fasta(path)
+    entries: Dict[str, FaiEntry] = {}
+    with open(fai) as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 5:
+                continue
+            name, *numbers = fields[:5]
+            entries[name] = FaiEntry(name, *(int(value) for value in numbers))
+    return entries
+
+
+def fetch_record(
+    path: str,
+    name: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    alphabet: str = "dna",
+    index: Optional[Dict[str, FaiEntry]] = None,
+) -> Sequence:
+    """
+    Read one record, or the bases [start, end) of it, by seeking straight
+    to them with the FASTA index; only the requested bytes are read.
+    Parameters
+    ----------
+    path : str
+        Path to an uncompressed FASTA file.
+    name : str
+        Record name (first word of its header).
+    start, end : int
+        0-based, half-open range of bases (default: the whole record).
+    alphabet : str
+        The alphabet used for the sequence (default is "dna").
+    index : dict[str, FaiEntry], optional
+        A loaded index; by default load_fasta_index(path) is used.
+    Returns
+    -------
+    Sequence
+        The record, with id "name" or "name:START-END" (1-based, inclusive)
+        for a subrange.
+    Raises
+    ------
+    ValueError
+        If the record is unknown or the range falls outside it.
+    """
+    if index is None:
+        index = load_fasta_index(path)
+    if name not in index:
+        raise ValueError(f"Record {name!r} not found in {path}")
+    entry = index[name]
+    whole = start == 0 and end is None
+    end = entry.length if end is None else end
+    if not 0 <= start <= end <= entry.length:
+        raise ValueError(
+            f"Range {start + 1}-{end} is outside record {name!r} "
+            f"of length {entry.length}"
+        )
+    residues = b""
+    if end > start:
+        first = _fai_position(entry, start)
+        last = _fai_position(entry, end - 1) + 1
+        with open(path, "rb") as f:
+            f.seek(first)
+            residues = f.read(last - first).translate(None, _FASTA_WHITESPACE)
+    identifier = name if whole else f"{name}:{start + 1}-{end}"
+    return Sequence(identifier, residues, alphabet)
+
+
+def _fai_position(entry: FaiEntry, base: int) -> int:
+    line, column = divmod(base, entry.line_bases)
+    return entry.offset + line * entry.line_width + column
+
+
+def parse_region(spec: str) -> Optional[Tuple[str, str, int, Optional[int]]]:
+    """
+    Split an input of the form "file.fa:NAME" or "file.fa:NAME:START-END"
+    (1-based, inclusive) into (path, name, start, end) with a 0-based,
+    half-open range. Returns None when spec is a plain file path.
+    """
+    if os.path.exists(spec):
+        return None
+    for colon in (i for i, char in enumerate(spec) if char == ":"):
+        path, region = spec[:colon], spec[colon + 1 :]
+        if not os.path.isfile(path):
+            continue
+        name, sep, span = region.rpartition(":")
+        first, dash, last = span.partition("-")
+        if sep and dash and first.isdigit() and last.isdigit():
+            return path, name, int(first) - 1, int(last)
+        return path, region, 0, None
+    return None
+
+
 def read_manual(alphabet: str = "dna") -> tuple[Sequence, Sequence]:
     """
     Read two sequences from user input.
@@ -104,11 +386,12 @@ def write_report(path: str, report: str) -> None:
 def format_report(
     seq1: Sequence,
     seq2: Sequence,
-    aligned1: str,
-    aligned2: str,
+    alignment: AlignmentResult,
     match: int,
     mismatch: int,
     gap: int,
+    gap_extend: Optional[int] = None,
+    substitution_matrix: Optional[str] = None,
 ) -> str:
     """
     Format alignment parameters, sequences, alignment, and metrics into a report string.
@@ -116,10 +399,16 @@ def format_report(
     ----------
     seq1, seq2
         The original Sequence objects.
-    aligned1, aligned2
-        The aligned sequences.
+    alignment
+        The alignment; its cached statistics are reported (an
+        (aligned1, aligned2) tuple is also accepted).
     match, mismatch, gap
         The number of matches, mismatches, and gaps in the alignmen
+    gap_extend
+        Gap extension score for affine scoring; gap is then the gap opening
+        score.
+    substitution_matrix
+        Name of the substitution matrix that replaced match/mismatch scoring.
     Returns
     -------
     str
@@ -129,41 +418,53 @@ def format_report(
     ValueError
         If the aligned sequences are empty or if the lengths do not match.
     """
-    length = len(aligned1)
-    identical = sum(1 for a, b in zip(aligned1, aligned2) if a == b)
-    percent = (identical / length * 100) if length > 0 else 0.0
-    total_gaps = aligned1.count("-") + aligned2.count("-")
+    alignment = as_result(alignment)
+
+    if gap_extend is None:
+        gap_lines = [f"  Gap penalty: {gap}"]
+    else:
+        gap_lines = [
+            f"  Gap open penalty: {gap}",
+            f"  Gap extend penalty: {gap_extend}",
+        ]
+
+    if substitution_matrix is None:
+        pair_lines = [f"  Match score: {match}", f"  Mismatch score: {mismatch}"]
+    else:
+        pair_lines = [f"  Substitution matrix: {substitution_matrix}"]
 
     lines = [
         "Parameters:",
-        f"  Match score: {match}",
-        f"  Mismatch score: {mismatch}",
-        f"  Gap penalty: {gap}",
+        *pair_lines,
+        *gap_lines,
         "",
         "Sequences:",
         f"  {seq1.id}: {seq1.sequence}",
         f"  {seq2.id}: {seq2.sequence}",
         "",
         "Alignment:",
-        f"  {aligned1}",
-        f"  {aligned2}",
+        f"  {alignment.aligned_seq1}",
+        f"  {alignment.aligned_seq2}",
         "",
         "Statistics:",
-        f"  Alignment length: {length}",
-        f"  Identical positions: {identical}",
-        f"  Percentage identity: {percent:.2f}%",
-        f"  Total gaps: {total_gaps}",
+        f"  Alignment length: {alignment.length}",
+        f"  Identical positions: {alignment.matches}",
+        f"  Percentage identity: {alignment.identity_pct:.2f}%",
+        f"  Total gaps: {alignment.gaps}",
     ]
+    if alignment.score is not None:
+        lines.append(f"  Score: {alignment.score}")
     return "\n".join(lines)
 
 
 def format_multi_report(
     seq1: Sequence,
     seq2: Sequence,
-    alignments: List[Tuple[str, str]],
+    alignments: List[AlignmentResult],
     match: int,
     mismatch: int,
     gap: int,
+    total: Optional[int] = None,
 ) -> str:
     """
     Build a multi‐path alignment report.
@@ -173,66 +474,227 @@ def format_multi_report(
     seq1, seq2
         The original Sequence objects.
     alignments
-        List of (aligned_seq1, aligned_seq2) tuples.
+        List of alignments (results or (aligned1, aligned2) tuples).
+    match, mismatch, gap
+        Scoring parameters.
+    total
+        Number of co-optimal alignments, if known; reported together with
+        how many of them are listed.
+    """
+    lines = iter_multi_report(
+        seq1,
+        seq2,
+        alignments,
+        match,
+        mismatch,
+        gap,
+        total=total,
+        shown=len(alignments),
+    )
+    return "\n".join(lines)
+
+
+def iter_multi_report(
+    seq1: Sequence,
+    seq2: Sequence,
+    alignments: Iterable[AlignmentResult],
+    match: int,
+    mismatch: int,
+    gap: int,
+    total: Optional[int] = None,
+    shown: Optional[int] = None,
+    substitution_matrix: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Yield the lines of a multi‐path alignment report as alignments arrive,
+    so that a lazy iterator of paths can be written without materialising it.
+
+    Parameters
+    ----------
+    seq1, seq2
+        The original Sequence objects.
+    alignments
+        Iterable of alignments (results or (aligned1, aligned2) tuples).
     match, mismatch, gap
         Scoring parameters.
+    total
+        Number of co-optimal alignments, if known.
+    shown
+        Number of alignments that will be listed, if known.
+    substitution_matrix
+        Name of the substitution matrix that replaced match/mismatch scoring.
     """
-    lines: List[str] = []
+    yield "Needleman–Wunsch Multi‐Path Alignment Report"
+    if substitution_matrix is None:
+        yield f"Parameters: match={match}, mismatch={mismatch}, gap={gap}"
+    else:
+        yield f"Parameters: substitution={substitution_matrix}, gap={gap}"
+    yield f"Sequence 1: {seq1.id}  {seq1.sequence}"
+    yield f"Sequence 2: {seq2.id}  {seq2.sequence}"
+    if total is not None:
+        suffix = f" (showing {shown})" if shown is not None else ""
+        yield f"Optimal alignments: {total}{suffix}"
+    yield ""
 
-    lines.append("Needleman–Wunsch Multi‐Path Alignment Report")
-    lines.append(f"Parameters: match={match}, mismatch={mismatch}, gap={gap}")
-    lines.append(f"Sequence 1: {seq1.id}  {seq1.sequence}")
-    lines.append(f"Sequence 2: {seq2.id}  {seq2.sequence}")
-    lines.append("")
+    for idx, alignment in enumerate(map(as_result, alignments), start=1):
+        yield f"Path {idx}:"
+        yield alignment.aligned_seq1
+        yield alignment.aligned_seq2
+        yield f"Length: {alignment.length}"
+        yield (
+            f"Identical positions: {alignment.matches} "
+            f"({alignment.identity_pct:.2f}%)"
+        )
+        yield f"Total gaps: {alignment.gaps}"
+        yield ""
 
-    for idx, (aln1, aln2) in enumerate(alignments, start=1):
-        length = len(aln1)
-        matches = sum(1 for a, b in zip(aln1, aln2) if a == b and a != "-")
-        identity_pct = matches / length * 100
-        gaps = aln1.count("-") + aln2.count("-")
 
-        lines.append(f"Path {idx}:")
-        lines.append(aln1)
-        lines.append(aln2)
-        lines.append(f"Length: {length}")
-        lines.append(f"Identical positions: {matches} ({identity_pct:.2f}%)")
-        lines.append(f"Total gaps: {gaps}")
-        lines.append("")
+def write_report_lines(path: str, lines: Iterable[str]) -> None:
+    """
+    Write report lines to a text file one at a time, producing the same
+    text as write_report with the lines joined by newlines.
+    Parameters
+    ----------
+    path : str
+        The path to the file to write the report to.
+    lines : Iterable[str]
+        The report lines, e.g. from iter_multi_report.
+    """
+    with open(path, "w") as f:
+        for idx, line in enumerate(lines):
+            if idx:
+                f.write("\n")
+            f.write(line)
 
-    return "\n".join(lines)
+
+SUMMARY_FIELDS = ("id1", "id2", "score", "length", "matches", "identity_pct", "gaps")
+
+
+def format_summary_row(row: Dict) -> str:
+    """
+    Format one batch summary row as a tab-separated line, with fields in
+    SUMMARY_FIELDS order. A rejected row (see --min-score) reads "rejected"
+    in place of its score and "-" for the other statistics.
+    Parameters
+    ----------
+    row : dict
+        A summary row, e.g. from aligner.batch.align_summary.
+    Returns
+    -------
+    str
+        The tab-separated line (without a newline).
+    """
+    values = []
+    for field in SUMMARY_FIELDS:
+        value = row[field]
+        if value is None:
+            values.append("rejected" if field == "score" else "-")
+            continue
+        values.append(f"{value:.2f}" if isinstance(value, float) else str(value))
+    return "\t".join(values)
+
+
+def write_distance_matrix(path: str, ids: List[str], distances) -> None:
+    """
+    Write a square distance matrix.
+    A path ending in ".npy" gets the raw float64 array; anything else gets
+    relaxed PHYLIP text: the number of taxa on the first line, then one line
+    per record with its name (the first word of its ID, padded to 10
+    characters but never truncated) and its distances, separated by spaces.
+    Parameters
+    ----------
+    path : str
+        The path to the file to write the matrix to.
+    ids : list[str]
+        Record IDs, in matrix order.
+    distances : array-like
+        N x N distance matrix.
+    """
+    if path.endswith(".npy"):
+        np.save(path, np.asarray(distances, dtype=np.float64))
+        return
+    with open(path, "w") as f:
+        for line in iter_phylip_lines(ids, distances):
+            f.write(line + "\n")
+
+
+def iter_phylip_lines(ids: List[str], distances) -> Iterator[str]:
+    """
+    Yield the lines of a relaxed PHYLIP square distance matrix, naming
+    each record by the first word of its header as the .fai index does.
+    """
+    yield str(len(ids))
+    for header, row in zip(ids, distances):
+        words = header.split()
+        name = words[0] if words else ""
+        values = " ".join(f"{value:.4f}" for value in row)
+        yield f"{name:<10} {values}"
+
+
+# Cells formatted per write when exporting a matrix as CSV.
+_CSV_CHUNK_CELLS = 1 << 20
 
 
 def write_matrix(path: str, matrix: List[List[int]]) -> None:
     """
-    Write the DP score matrix to CSV.
-    Each row of the matrix becomes one line of comma-separated values.
-    The first row is the header with column indices.
-    The first column is the row index.
+    Write the DP score matrix to CSV, or to NumPy's binary formats.
+    A path ending in ".npy" gets the matrix as one int64 array that other
+    tools can memory-map (an ndarray from the numpy engine is saved straight
+    from its buffer; nested lists are copied in row by row), and ".npz" a
+    compressed archive holding it under the name "matrix".
+    Otherwise each row of the matrix becomes one line of comma-separated
+    values, formatted a chunk of rows at a time.
     Parameters
     ----------
     path : str
         The path to the file to write the matrix to.
     matrix : list[list[int]]
-        The DP score matrix to write to the file.
+        The DP score matrix to write to the file (nested lists or a NumPy
+        array).
     Raises
     ------
     IOError
         If there is an error writing to the file.
     """
+    if path.endswith(".npy"):
+        if isinstance(matrix, np.ndarray):
+            np.save(path, matrix)
+            return
+        shape = (len(matrix), len(matrix[0]) if len(matrix) else 0)
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.int64, shape=shape)
+        for i, row in enumerate(matrix):
+            out[i] = row
+        out.flush()
+        del out
+        return
+    if path.endswith(".npz"):
+        np.savez_compressed(path, matrix=np.asarray(matrix, dtype=np.int64))
+        return
+    width = len(matrix[0]) if len(matrix) else 0
+    line = ",".join(["%d"] * width) + "\r\n"  # csv.writer's line ending
+    step = max(1, _CSV_CHUNK_CELLS // max(width, 1))
     with open(path, "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        for row in matrix:
-            writer.writerow(row)
+        for start in range(0, len(matrix), step):
+            block = matrix[start : start + step]
+            if hasattr(block, "tolist"):
+                block = block.tolist()
+            csvfile.write("".join([line % tuple(row) for row in block]))
+
+
+MATRIX_MODES = ("full", "summary", "none")
 
 
 def create_output_dict(
     seq1: Sequence,
     seq2: Sequence,
     matrix: List[List[int]],
-    alignments: List[Tuple[str, str]],
+    alignments: List[AlignmentResult],
     match: int,
     mismatch: int,
     gap: int,
+    gap_extend: Optional[int] = None,
+    substitution_matrix: Optional[str] = None,
+    matrix_mode: str = "full",
 ) -> Dict:
     """
     Package everything into a serializable dict:
@@ -245,11 +707,21 @@ def create_output_dict(
     seq1, seq2
         The original Sequence objects.
     matrix
-        The DP score matrix.
+        The DP score matrix (nested lists or a NumPy array). It is stored
+        as is, not copied; write_json streams it row by row.
     alignments
-        List of (aligned_seq1, aligned_seq2) tuples.
+        List of alignments (results or (aligned1, aligned2) tuples).
     match, mismatch, gap
         Scoring parameters.
+    gap_extend
+        Gap extension score for affine scoring, added to the parameters
+        when given.
+    substitution_matrix
+        Name of the substitution matrix used, added to the parameters when
+        given.
+    matrix_mode
+        "full" to include the matrix, "summary" for its shape, range and
+        final score only, "none" to leave it out.
     Returns
     -------
     dict
@@ -259,44 +731,102 @@ def create_output_dict(
     ValueError
         If the sequences are empty or if the lengths do not match.
     """
-    paths = []
-    for aln1, aln2 in alignments:
-        length = len(aln1)
-        matches = sum(1 for a, b in zip(aln1, aln2) if a == b and a != "-")
-        identity_pct = matches / length * 100
-        gaps = aln1.count("-") + aln2.count("-")
-        paths.append(
-            {
-                "aligned_seq1": aln1,
-                "aligned_seq2": aln2,
-                "length": length,
-                "matches": matches,
-                "identity_pct": identity_pct,
-                "gaps": gaps,
-            }
-        )
+    paths = [as_result(alignment).as_dict() for alignment in alignments]
 
-    return {
+    parameters = {"match": match, "mismatch": mismatch, "gap": gap}
+    if gap_extend is not None:
+        parameters["gap_extend"] = gap_extend
+    if substitution_matrix is not None:
+        parameters["substitution_matrix"] = substitution_matrix
+
+    data = {
         "sequences": {seq1.id: seq1.sequence, seq2.id: seq2.sequence},
-        "parameters": {"match": match, "mismatch": mismatch, "gap": gap},
-        "matrix": matrix,
-        "alignments": paths,
+        "parameters": parameters,
+    }
+    if matrix_mode == "full":
+        data["matrix"] = matrix
+    elif matrix_mode == "summary":
+        data["matrix"] = matrix_summary(matrix)
+    elif matrix_mode != "none":
+        raise ValueError(f"Unknown matrix mode: {matrix_mode}")
+    data["alignments"] = paths
+    return data
+
+
+def matrix_summary(matrix) -> Dict:
+    """
+    Describe a score matrix by its shape, value range and final score.
+    """
+    scores = np.asarray(matrix)
+    return {
+        "shape": list(scores.shape),
+        "min": int(scores.min()),
+        "max": int(scores.max()),
+        "score": int(scores[-1, -1]),
     }
 
 
 def write_json(path: str, data: Dict) -> None:
     """
     Write the dict `data` out as pretty JSON.
+    The output is streamed: a "matrix" entry is written one row per line
+    as it is read, so neither the matrix as nested lists nor the JSON text
+    is ever held in memory.
     Parameters
     ----------
     path
         The path to write the JSON to.
     data
-        The data to write.e_path, "w"
+        The data to write.
     Raises
     ------
     FileNotFoundError
         If the path does not exist.
     """
     with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+        f.writelines(iter_json(data))
+
+
+def iter_json(data: Dict) -> Iterator[str]:
+    """
+    Yield the JSON text of data in pieces, with a list-like "matrix" entry
+    (nested lists or a NumPy array) emitted one compact row at a time.
+    """
+    yield "{"
+    for idx, (key, value) in enumerate(data.items()):
+        yield ("," if idx else "") + f"\n  {json.dumps(key)}: "
+        if key == "matrix" and not isinstance(value, dict):
+            yield from _iter_json_rows(value)
+        else:
+            yield json.dumps(value, indent=2).replace("\n", "\n  ")
+    yield "\n}\n"
+
+
+def _iter_json_rows(matrix) -> Iterator[str]:
+    yield "["
+    for idx, row in enumerate(matrix):
+        values = row.tolist() if hasattr(row, "tolist") else row
+        yield ("," if idx else "") + "\n    [" + ", ".join(map(str, values)) + "]"
+    yield "\n  ]"
+
+
+def write_jsonl(path: str, records: Iterable[Dict]) -> None:
+    """
+    Write one compact JSON object per line (JSON Lines), as records arrive.
+    Parameters
+    ----------
+    path
+        The path to write the records to.
+    records
+        The dicts to write; consumed lazily.
+    """
+    with open(path, "w") as f:
+        f.writelines(iter_jsonl_lines(records))
+
+
+def iter_jsonl_lines(records: Iterable[Dict]) -> Iterator[str]:
+    """
+    Yield each record as one newline-terminated line of compact JSON.
+    """
+    for record in records:
+        yield json.dumps(record, separators=(",", ":")) + "\n"
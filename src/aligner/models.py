@@ -1,5 +1,14 @@
-import re
-from typing import Literal
+from typing import Literal, Union
+import numpy as np
+
+# Case folding table for bytes.translate: lowercase ASCII to uppercase.
+_UPPER = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz", b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+# Valid (uppercase) symbols of each alphabet.
+_ALPHABETS = {
+    "dna": b"ACGT",
+    "protein": b"ACDEFGHIKLMNPQRSTVWY",
+}
 
 
 class Sequence:
@@ -7,12 +16,20 @@ class Sequence:
     A simple container for an ID and a biological sequence string.
     The sequence can be either DNA or protein, and the class validates the sequence
     against the specified alphabet.
+    The residues are stored once, uppercased, in an immutable bytes buffer;
+    engines read them through data, buffer or codes without copying.
     Attributes
     ----------
     id : str
         The sequence ID.
     sequence : str
-        The sequence string.
+        The sequence string, decoded from the byte buffer on access.
+    data : bytes
+        The uppercased sequence bytes.
+    buffer : memoryview
+        A zero-copy view of data.
+    codes : np.ndarray
+        A zero-copy, read-only uint8 array over data.
     alphabet : str
         The alphabet to validate the sequence agains
     Methods
@@ -27,15 +44,28 @@ class Sequence:
         Return a string representation of the sequence.
     """
 
+    __slots__ = ("id", "alphabet", "_data")
+
     def __init__(
         self,
         identifier: str,
-        sequence: str,
+        sequence: Union[str, bytes, bytearray, memoryview],
         alphabet: Literal["dna", "protein"] = "dna",
     ):
         self.id = identifier
-        self.sequence = sequence.upper()
         self.alphabet = alphabet
+        if isinstance(sequence, str):
+            # latin-1 maps every code point below 256 to one byte, so
+            # non-ASCII letters survive to be reported by _validate
+            try:
+                raw = sequence.encode("latin-1")
+            except UnicodeEncodeError:
+                raise ValueError(
+                    f"Invalid characters in sequence {identifier!r} for {alphabet}"
+                ) from None
+        else:
+            raw = sequence
+        self._data = bytes(raw).translate(_UPPER)
         self._validate()
 
     def _validate(self):
@@ -43,20 +73,128 @@ class Sequence:
         Ensure the sequence contains only valid characters for the chosen alphabet.
         Empty sequences are now allowed.
         """
-        if self.alphabet.lower() == "dna":
-            pat = r"^[ACGTacgt]*$"
-        elif self.alphabet.lower() == "protein":
-            pat = r"^[ACDEFGHIKLMNPQRSTVWYacdefghiklmnpqrstvwy]*$"
-        else:
+        valid = _ALPHABETS.get(self.alphabet.lower())
+        if valid is None:
             raise ValueError(f"Unknown alphabet: {self.alphabet}")
 
-        if not re.fullmatch(pat, self.sequence):
+        # deleting every valid symbol leaves only the offending ones
+        if self._data.translate(None, valid):
             raise ValueError(
                 f"Invalid characters in sequence {self.id!r} for {self.alphabet}"
             )
 
+    @property
+    def sequence(self) -> str:
+        return self._data.decode("ascii")
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+    @property
+    def buffer(self) -> memoryview:
+        return memoryview(self._data)
+
+    @property
+    def codes(self) -> np.ndarray:
+        return np.frombuffer(self._data, dtype=np.uint8)
+
     def __len__(self):
-        return len(self.sequence)
+        return len(self._data)
 
     def __repr__(self):
         return f"Sequence(id={self.id!r}, sequence={self.sequence!r})"
+
+
+class AlignmentResult:
+    """
+    A pairwise alignment with its score and statistics.
+    The statistics are computed together, in one vectorized pass over the
+    aligned strings, the first time any of them is read, and then cached,
+    so every reporter of a run shares them.
+    Unpacking a result yields the two aligned strings, like the tuples the
+    traceback functions return.
+    Attributes
+    ----------
+    aligned_seq1, aligned_seq2 : str
+        The aligned sequences, with '-' for gaps.
+    score : int or None
+        The alignment score, when known.
+    length : int
+        Number of alignment columns.
+    matches : int
+        Number of columns pairing identical symbols.
+    identity_pct : float
+        matches as a percentage of length.
+    gaps : int
+        Number of gap symbols in both rows.
+    Methods
+    -------
+    as_dict
+        Return the alignment, its score and its statistics as a JSON-ready
+        dict.
+    """
+
+    __slots__ = ("aligned_seq1", "aligned_seq2", "score", "_stats")
+
+    def __init__(self, aligned_seq1: str, aligned_seq2: str, score=None):
+        self.aligned_seq1 = aligned_seq1
+        self.aligned_seq2 = aligned_seq2
+        self.score = score
+        self._stats = None
+
+    def _statistics(self) -> tuple:
+        if self._stats is None:
+            row1 = np.frombuffer(self.aligned_seq1.encode("latin-1"), dtype=np.uint8)
+            row2 = np.frombuffer(self.aligned_seq2.encode("latin-1"), dtype=np.uint8)
+            gaps = self.aligned_seq1.count("-") + self.aligned_seq2.count("-")
+            matches = int(np.count_nonzero((row1 == row2) & (row1 != ord("-"))))
+            self._stats = (len(row1), matches, gaps)
+        return self._stats
+
+    @property
+    def length(self) -> int:
+        return self._statistics()[0]
+
+    @property
+    def matches(self) -> int:
+        return self._statistics()[1]
+
+    @property
+    def identity_pct(self) -> float:
+        length, matches, _ = self._statistics()
+        return matches / length * 100 if length else 0.0
+
+    @property
+    def gaps(self) -> int:
+        return self._statistics()[2]
+
+    def as_dict(self) -> dict:
+        return {
+            "aligned_seq1": self.aligned_seq1,
+            "aligned_seq2": self.aligned_seq2,
+            "score": self.score,
+            "length": self.length,
+            "matches": self.matches,
+            "identity_pct": self.identity_pct,
+            "gaps": self.gaps,
+        }
+
+    def __iter__(self):
+        return iter((self.aligned_seq1, self.aligned_seq2))
+
+    def __repr__(self):
+        return (
+            f"AlignmentResult(aligned_seq1={self.aligned_seq1!r}, "
+            f"aligned_seq2={self.aligned_seq2!r}, score={self.score!r})"
+        )
+
+
+def as_result(alignment) -> AlignmentResult:
+    """
+    Return alignment as an AlignmentResult, wrapping an (aligned1, aligned2)
+    tuple.
+    """
+    if isinstance(alignment, AlignmentResult):
+        return alignment
+    return AlignmentResult(*alignment)
@@ -4,14 +4,14 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from typing import List, Dict, Optional
-from aligner.models import Sequence
+from aligner.models import AlignmentResult, Sequence
 
 
 def write_pdf(
     path: str,
     seq1: Sequence,
     seq2: Sequence,
-    alignments: List[Dict],
+    alignments: List[AlignmentResult],
     parameters: Dict,
     image_path: Optional[str] = None,
 ) -> None:
@@ -28,12 +28,14 @@ def write_pdf(
     seq1, seq2
         The original Sequence objects.
     alignments
-        List of dictionaries containing alignment information.
+        The alignments to report, with their cached statistics.
     parameters
         Dictionary containing the parameters used to generate the alignmen
         - match
         - mismatch
         - gap
+        - gap_extend (affine scoring only)
+        - substitution_matrix (when one replaced match/mismatch)
     image_path
         Path to the image to include in the report (optional).
     Returns
@@ -53,6 +55,10 @@ def write_pdf(
         ["Mismatch", parameters["mismatch"]],
         ["Gap penalty", parameters["gap"]],
     ]
+    if "gap_extend" in parameters:
+        param_data.append(["Gap extend", parameters["gap_extend"]])
+    if "substitution_matrix" in parameters:
+        param_data.append(["Substitution", parameters["substitution_matrix"]])
     tbl = Table(param_data, colWidths=[100, 50])
     tbl.setStyle(
         TableStyle(
@@ -75,12 +81,12 @@ def write_pdf(
 
     for idx, path in enumerate(alignments, start=1):
         story.append(Paragraph(f"Path {idx}", styles["Heading2"]))
-        story.append(Paragraph(path["aligned_seq1"], styles["Code"]))
-        story.append(Paragraph(path["aligned_seq2"], styles["Code"]))
+        story.append(Paragraph(path.aligned_seq1, styles["Code"]))
+        story.append(Paragraph(path.aligned_seq2, styles["Code"]))
         stats = [
-            ["Length", path["length"]],
-            ["Matches", f"{path['matches']} ({path['identity_pct']:.2f}%)"],
-            ["Gaps", path["gaps"]],
+            ["Length", path.length],
+            ["Matches", f"{path.matches} ({path.identity_pct:.2f}%)"],
+            ["Gaps", path.gaps],
         ]
         t = Table(stats, colWidths=[100, 100])
         t.setStyle(
@@ -1,19 +1,54 @@
+import math
 import matplotlib.pyplot as plt
-from typing import List
+import numpy as np
+from typing import List, Optional, Tuple, Union
 
+# Rows of the matrix converted to an array at a time while pooling.
+_BAND_CELLS = 1 << 22
 
-def plot_matrix(matrix: List[List[int]], path: str, show: bool = False) -> plt.Figure:
+
+def plot_matrix(
+    matrix: Union[List[List[int]], np.ndarray, str],
+    path: str,
+    show: bool = False,
+    alignment: Optional[Tuple[str, str]] = None,
+    reduce: str = "max",
+) -> plt.Figure:
     """
     Plot the scoring matrix as a heatmap and save to the specified path.
 
-    :param matrix: 2D list of scores
+    A matrix larger than the plot area is first block-reduced to about one
+    block per output pixel, so rendering costs depend on the image size,
+    not on the matrix size. The matrix is pooled a band of rows at a time,
+    so a memory-mapped matrix is never loaded as a whole.
+
+    :param matrix: 2D list or array of scores, or the path of a .npy file,
+        which is memory-mapped
     :param path: Filepath to save the PNG
     :param show: Whether to display the plot interactively
+    :param alignment: Aligned strings whose traceback path is drawn over
+        the heatmap
+    :param reduce: "max" or "mean" pooling of the cells of each block
     :return: Matplotlib Figure object
     """
+    if isinstance(matrix, str):
+        matrix = np.load(matrix, mmap_mode="r")
     fig, ax = plt.subplots()
-    cax = ax.imshow(matrix, interpolation="nearest", aspect="auto")
+    width, height = ax.get_window_extent().size
+    n = len(matrix)
+    m = len(matrix[0]) if n else 0
+    image = _pool(matrix, math.ceil(n / height), math.ceil(m / width), reduce)
+    # extent keeps the axes in matrix coordinates whatever the pooling
+    cax = ax.imshow(
+        image,
+        interpolation="nearest",
+        aspect="auto",
+        extent=(-0.5, m - 0.5, n - 0.5, -0.5),
+    )
     fig.colorbar(cax, ax=ax)
+    if alignment is not None:
+        rows, cols = traceback_path(*alignment)
+        ax.plot(cols, rows, color="white", linewidth=1)
     ax.set_xlabel("Sequence 2 position")
     ax.set_ylabel("Sequence 1 position")
     ax.set_title("Scoring Matrix Heatmap")
@@ -23,3 +58,52 @@ def plot_matrix(matrix: List[List[int]], path: str, show: bool = False) -> plt.F
         plt.show()
     plt.close(fig)
     return fig
+
+
+def _pool(matrix, block_rows: int, block_cols: int, reduce: str) -> np.ndarray:
+    """
+    Reduce each block_rows x block_cols block of matrix to its max or mean.
+    """
+    if reduce not in ("max", "mean"):
+        raise ValueError(f"Unknown reduction: {reduce}")
+    n = len(matrix)
+    m = len(matrix[0]) if n else 0
+    block_rows, block_cols = max(block_rows, 1), max(block_cols, 1)
+    if block_rows == 1 and block_cols == 1:
+        return np.asarray(matrix, dtype=np.float64)
+
+    starts = np.arange(0, m, block_cols)
+    widths = np.diff(np.append(starts, m))
+    # whole blocks of rows per band, so no block spans two bands
+    step = block_rows * max(1, _BAND_CELLS // max(block_rows * m, 1))
+    pooled = []
+    for r0 in range(0, n, step):
+        band = np.asarray(matrix[r0 : r0 + step], dtype=np.float64)
+        row_starts = np.arange(0, len(band), block_rows)
+        if reduce == "max":
+            cols = np.maximum.reduceat(band, starts, axis=1)
+            pooled.append(np.maximum.reduceat(cols, row_starts, axis=0))
+        else:
+            cols = np.add.reduceat(band, starts, axis=1)
+            sums = np.add.reduceat(cols, row_starts, axis=0)
+            heights = np.diff(np.append(row_starts, len(band)))
+            pooled.append(sums / np.outer(heights, widths))
+    return np.concatenate(pooled)
+
+
+def traceback_path(aligned1: str, aligned2: str) -> Tuple[List[int], List[int]]:
+    """
+    Return the row and column indices of the matrix cells an alignment
+    passes through, from (0, 0) to (len(seq1), len(seq2)).
+    """
+    rows = [0]
+    cols = [0]
+    i = j = 0
+    for char1, char2 in zip(aligned1, aligned2):
+        if char1 != "-":
+            i += 1
+        if char2 != "-":
+            j += 1
+        rows.append(i)
+        cols.append(j)
+    return rows, cols
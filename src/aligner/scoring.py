@@ -0,0 +1,215 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+import numpy as np
+
+
+class SubstitutionMatrix:
+    """
+    A table of pairwise symbol scores with an integer encoding of its alphabet.
+
+    Sequences are encoded once into small-integer code arrays; the score of
+    a pair is then scores[code1, code2], and the scores of one symbol
+    against a whole encoded sequence are gathered in a single array
+    operation.
+    Attributes
+    ----------
+    name : str
+        Name used in reports (e.g. "BLOSUM62").
+    alphabet : str
+        The symbols, in code order; empty for a uniform table, which encodes
+        raw byte values.
+    scores : np.ndarray
+        Square int64 array of pair scores indexed by code.
+    Methods
+    -------
+    uniform
+        Build a match/mismatch table over all byte values.
+    encode
+        Turn a sequence into its code array.
+    score
+        Score a single pair of symbols.
+    max_score
+        The highest score of any pair.
+    """
+
+    def __init__(self, name: str, alphabet: str, scores, uniform=None):
+        self.name = name
+        self.alphabet = alphabet
+        self.scores = np.asarray(scores, dtype=np.int64)
+        self._uniform = uniform
+        if alphabet:
+            if self.scores.shape != (len(alphabet), len(alphabet)):
+                raise ValueError(
+                    f"Substitution matrix {name!r} must be "
+                    f"{len(alphabet)}x{len(alphabet)}"
+                )
+            # unknown symbols map to len(alphabet) and are rejected in encode
+            self._codes = np.full(256, len(alphabet), dtype=np.uint8)
+            for code, symbol in enumerate(alphabet):
+                self._codes[ord(symbol.upper())] = code
+                self._codes[ord(symbol.lower())] = code
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def uniform(cls, match: int, mismatch: int) -> "SubstitutionMatrix":
+        """
+        Return the table scoring identical bytes as match and all other
+        pairs as mismatch; its codes are the raw byte values.
+        """
+        scores = np.full((256, 256), mismatch, dtype=np.int64)
+        np.fill_diagonal(scores, match)
+        return cls(f"match={match}, mismatch={mismatch}", "", scores, (match, mismatch))
+
+    @property
+    def match_mismatch(self) -> Optional[tuple]:
+        """
+        The (match, mismatch) pair of a uniform table, otherwise None.
+        """
+        return self._uniform
+
+    def encode(self, sequence: Union[str, bytes]) -> np.ndarray:
+        """
+        Encode a sequence into a uint8 array of codes.
+        """
+        if isinstance(sequence, str):
+            sequence = sequence.encode("ascii")
+        raw = np.frombuffer(sequence, dtype=np.uint8)
+        if not self.alphabet:
+            return raw
+        codes = self._codes[raw]
+        if codes.size and codes.max() == len(self.alphabet):
+            bad = sorted({chr(c) for c in raw[codes == len(self.alphabet)]})
+            raise ValueError(
+                f"Symbols {''.join(bad)!r} are not in substitution matrix {self.name}"
+            )
+        return codes
+
+    def score(self, a: str, b: str) -> int:
+        """
+        Score one pair of symbols.
+        """
+        return int(self.scores[self.encode(a)[0], self.encode(b)[0]])
+
+    def max_score(self) -> int:
+        """
+        The highest score any pair of symbols can get.
+        """
+        if self._uniform is not None:
+            return max(self._uniform)
+        return int(self.scores.max())
+
+    def __repr__(self):
+        return f"SubstitutionMatrix({self.name!r})"
+
+
+def parse_substitution_matrix(text: str, name: str = "custom") -> SubstitutionMatrix:
+    """
+    Parse a matrix in the NCBI text format: '#' comment lines, a header
+    line with the column symbols, then one row per symbol starting with
+    that symbol.
+    """
+    rows: List[List[str]] = [
+        line.split()
+        for line in text.splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+    if not rows:
+        raise ValueError(f"Empty substitution matrix: {name}")
+    columns = rows[0]
+    scores: Dict[str, List[int]] = {}
+    for fields in rows[1:]:
+        symbol, values = fields[0], fields[1:]
+        if len(values) != len(columns):
+            raise ValueError(f"Row {symbol!r} of {name} has {len(values)} scores")
+        scores[symbol] = [int(value) for value in values]
+    if sorted(scores) != sorted(columns):
+        raise ValueError(f"Rows and columns of {name} name different symbols")
+    table = [scores[symbol] for symbol in columns]
+    return SubstitutionMatrix(name, "".join(columns), table)
+
+
+def load_substitution_matrix(name_or_path: str) -> SubstitutionMatrix:
+    """
+    Return a built-in matrix by name (BLOSUM62, PAM250) or load one from a
+    file in the NCBI text format.
+    """
+    if name_or_path.upper() in _BUILTIN:
+        return _builtin(name_or_path.upper())
+    with open(name_or_path) as f:
+        return parse_substitution_matrix(f.read(), name_or_path)
+
+
+@lru_cache(maxsize=None)
+def _builtin(name: str) -> SubstitutionMatrix:
+    return parse_substitution_matrix(_BUILTIN[name], name)
+
+
+def resolve_scoring(
+    substitution: Optional[SubstitutionMatrix], match: int, mismatch: int
+) -> SubstitutionMatrix:
+    """
+    Return substitution, or the uniform match/mismatch table when it is None.
+    """
+    if substitution is not None:
+        return substitution
+    return SubstitutionMatrix.uniform(match, mismatch)
+
+
+BUILTIN_MATRICES = ("BLOSUM62", "PAM250")
+
+_BUILTIN = {
+    "BLOSUM62": """\
+   A  R  N  D  C  Q  E  G  H  I  L  K  M  F  P  S  T  W  Y  V  B  Z  X  *
+A  4 -1 -2 -2  0 -1 -1  0 -2 -1 -1 -1 -1 -2 -1  1  0 -3 -2  0 -2 -1  0 -4
+R -1  5  0 -2 -3  1  0 -2  0 -3 -2  2 -1 -3 -2 -1 -1 -3 -2 -3 -1  0 -1 -4
+N -2  0  6  1 -3  0  0  0  1 -3 -3  0 -2 -3 -2  1  0 -4 -2 -3  3  0 -1 -4
+D -2 -2  1  6 -3  0  2 -1 -1 -3 -4 -1 -3 -3 -1  0 -1 -4 -3 -3  4  1 -1 -4
+C  0 -3 -3 -3  9 -3 -4 -3 -3 -1 -1 -3 -1 -2 -3 -1 -1 -2 -2 -1 -3 -3 -2 -4
+Q -1  1  0  0 -3  5  2 -2  0 -3 -2  1  0 -3 -1  0 -1 -2 -1 -2  0  3 -1 -4
+E -1  0  0  2 -4  2  5 -2  0 -3 -3  1 -2 -3 -1  0 -1 -3 -2 -2  1  4 -1 -4
+G  0 -2  0 -1 -3 -2 -2  6 -2 -4 -4 -2 -3 -3 -2  0 -2 -2 -3 -3 -1 -2 -1 -4
+H -2  0  1 -1 -3  0  0 -2  8 -3 -3 -1 -2 -1 -2 -1 -2 -2  2 -3  0  0 -1 -4
+I -1 -3 -3 -3 -1 -3 -3 -4 -3  4  2 -3  1  0 -3 -2 -1 -3 -1  3 -3 -3 -1 -4
+L -1 -2 -3 -4 -1 -2 -3 -4 -3  2  4 -2  2  0 -3 -2 -1 -2 -1  1 -4 -3 -1 -4
+K -1  2  0 -1 -3  1  1 -2 -1 -3 -2  5 -1 -3 -1  0 -1 -3 -2 -2  0  1 -1 -4
+M -1 -1 -2 -3 -1  0 -2 -3 -2  1  2 -1  5  0 -2 -1 -1 -1 -1  1 -3 -1 -1 -4
+F -2 -3 -3 -3 -2 -3 -3 -3 -1  0  0 -3  0  6 -4 -2 -2  1  3 -1 -3 -3 -1 -4
+P -1 -2 -2 -1 -3 -1 -1 -2 -2 -3 -3 -1 -2 -4  7 -1 -1 -4 -3 -2 -2 -1 -2 -4
+S  1 -1  1  0 -1  0  0  0 -1 -2 -2  0 -1 -2 -1  4  1 -3 -2 -2  0  0  0 -4
+T  0 -1  0 -1 -1 -1 -1 -2 -2 -1 -1 -1 -1 -2 -1  1  5 -2 -2  0 -1 -1  0 -4
+W -3 -3 -4 -4 -2 -2 -3 -2 -2 -3 -2 -3 -1  1 -4 -3 -2 11  2 -3 -4 -3 -2 -4
+Y -2 -2 -2 -3 -2 -1 -2 -3  2 -1 -1 -2 -1  3 -3 -2 -2  2  7 -1 -3 -2 -1 -4
+V  0 -3 -3 -3 -1 -2 -2 -3 -3  3  1 -2  1 -1 -2 -2  0 -3 -1  4 -3 -2 -1 -4
+B -2 -1  3  4 -3  0  1 -1  0 -3 -4  0 -3 -3 -2  0 -1 -4 -3 -3  4  1 -1 -4
+Z -1  0  0  1 -3  3  4 -2  0 -3 -3  1 -1 -3 -1  0 -1 -3 -2 -2  1  4 -1 -4
+X  0 -1 -1 -1 -2 -1 -1 -1 -1 -1 -1 -1 -1 -1 -2  0  0 -2 -1 -1 -1 -1 -1 -4
+* -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4  1
+""",
+    "PAM250": """\
+   A  R  N  D  C  Q  E  G  H  I  L  K  M  F  P  S  T  W  Y  V  B  Z  X  *
+A  2 -2  0  0 -2  0  0  1 -1 -1 -2 -1 -1 -3  1  1  1 -6 -3  0  0  0  0 -8
+R -2  6  0 -1 -4  1 -1 -3  2 -2 -3  3  0 -4  0  0 -1  2 -4 -2 -1  0 -1 -8
+N  0  0  2  2 -4  1  1  0  2 -2 -3  1 -2 -3  0  1  0 -4 -2 -2  2  1  0 -8
+D  0 -1  2  4 -5  2  3  1  1 -2 -4  0 -3 -6 -1  0  0 -7 -4 -2  3  3 -1 -8
+C -2 -4 -4 -5 12 -5 -5 -3 -3 -2 -6 -5 -5 -4 -3  0 -2 -8  0 -2 -4 -5 -3 -8
+Q  0  1  1  2 -5  4  2 -1  3 -2 -2  1 -1 -5  0 -1 -1 -5 -4 -2  1  3 -1 -8
+E  0 -1  1  3 -5  2  4  0  1 -2 -3  0 -2 -5 -1  0  0 -7 -4 -2  3  3 -1 -8
+G  1 -3  0  1 -3 -1  0  5 -2 -3 -4 -2 -3 -5  0  1  0 -7 -5 -1  0  0 -1 -8
+H -1  2  2  1 -3  3  1 -2  6 -2 -2  0 -2 -2  0 -1 -1 -3  0 -2  1  2 -1 -8
+I -1 -2 -2 -2 -2 -2 -2 -3 -2  5  2 -2  2  1 -2 -1  0 -5 -1  4 -2 -2 -1 -8
+L -2 -3 -3 -4 -6 -2 -3 -4 -2  2  6 -3  4  2 -3 -3 -2 -2 -1  2 -3 -3 -1 -8
+K -1  3  1  0 -5  1  0 -2  0 -2 -3  5  0 -5 -1  0  0 -3 -4 -2  1  0 -1 -8
+M -1  0 -2 -3 -5 -1 -2 -3 -2  2  4  0  6  0 -2 -2 -1 -4 -2  2 -2 -2 -1 -8
+F -3 -4 -3 -6 -4 -5 -5 -5 -2  1  2 -5  0  9 -5 -3 -3  0  7 -1 -4 -5 -2 -8
+P  1  0  0 -1 -3  0 -1  0  0 -2 -3 -1 -2 -5  6  1  0 -6 -5 -1 -1  0 -1 -8
+S  1  0  1  0  0 -1  0  1 -1 -1 -3  0 -2 -3  1  2  1 -2 -3 -1  0  0  0 -8
+T  1 -1  0  0 -2 -1  0  0 -1  0 -2  0 -1 -3  0  1  3 -5 -3  0  0 -1  0 -8
+W -6  2 -4 -7 -8 -5 -7 -7 -3 -5 -2 -3 -4  0 -6 -2 -5 17  0 -6 -5 -6 -4 -8
+Y -3 -4 -2 -4  0 -4 -4 -5  0 -1 -1 -4 -2  7 -5 -3 -3  0 10 -2 -3 -4 -2 -8
+V  0 -2 -2 -2 -2 -2 -2 -1 -2  4  2 -2  2 -1 -1 -1  0 -6 -2  4 -2 -2 -1 -8
+B  0 -1  2  3 -4  1  3  0  1 -2 -3  1 -2 -4 -1  0  0 -5 -3 -2  3  2 -1 -8
+Z  0  0  1  3 -5  3  3  0  2 -2 -3  0 -2 -5  0  0 -1 -6 -4 -2  2  3 -1 -8
+X  0 -1  0 -1 -3 -1 -1 -1 -1 -1 -1 -1 -1 -2 -1  0  0 -4 -2 -1 -1 -1 -1 -8
+* -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8 -8  1
+""",
+}
@@ -0,0 +1,48 @@
+import importlib
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+# Output backends by name: the module and function implementing each, and
+# the optional-dependency extra that provides its third-party imports. The
+# modules import matplotlib, jinja2 or reportlab at load time, so they are
+# only imported when their output is requested.
+WRITERS: Dict[str, Tuple[str, str, Optional[str]]] = {
+    "plot": ("aligner.plot", "plot_matrix", None),
+    "html": ("aligner.html_report", "format_html_report", "html"),
+    "pdf": ("aligner.pdf_report", "write_pdf", "pdf"),
+}
+
+
+@lru_cache(maxsize=None)
+def get_writer(name: str) -> Callable:
+    """
+    Import the output backend registered under name and return its function.
+
+    Parameters
+    ----------
+    name : str
+        A key of WRITERS ("plot", "html" or "pdf").
+    Returns
+    -------
+    Callable
+        The backend function, e.g. aligner.plot.plot_matrix for "plot".
+    Raises
+    ------
+    ValueError
+        If no backend is registered under name.
+    ImportError
+        If the backend's optional dependency is not installed.
+    """
+    try:
+        module_name, attribute, extra = WRITERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown output backend: {name}") from None
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as exc:
+        if extra is None:
+            raise
+        raise ImportError(
+            f"{name} output requires {exc.name}; install needleman-wunsch[{extra}]"
+        ) from exc
+    return getattr(module, attribute)
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from aligner.batch import (
+    _upper_cells,
+    align_summary,
+    all_vs_all,
+    cross_pairs,
+    identity_distances,
+    read_pairs,
+    run_batch,
+    search,
+)
+from aligner.io import format_summary_row
+from aligner.core import score_only
+from aligner.models import Sequence
+
+
+def _records():
+    recs1 = [Sequence("a1", "GATTACA"), Sequence("a2", "ACGT")]
+    recs2 = [Sequence("b1", "GCATGCA"), Sequence("b2", "ACG")]
+    return recs1, recs2
+
+
+def test_cross_pairs():
+    recs1, recs2 = _records()
+    ids = [(s1.id, s2.id) for s1, s2 in cross_pairs(iter(recs1), recs2)]
+    assert ids == [("a1", "b1"), ("a1", "b2"), ("a2", "b1"), ("a2", "b2")]
+
+
+def test_read_pairs(tmp_path):
+    recs1, recs2 = _records()
+    path = tmp_path / "pairs.txt"
+    path.write_text("# comment\na2 b1\n\na1 b2\n")
+    pairs = read_pairs(str(path), recs1, recs2)
+    assert [(s1.id, s2.id) for s1, s2 in pairs] == [("a2", "b1"), ("a1", "b2")]
+
+    path.write_text("a1 nope\n")
+    with pytest.raises(ValueError):
+        read_pairs(str(path), recs1, recs2)
+
+
+def test_align_summary():
+    row = align_summary(Sequence("s1", "ACGT"), Sequence("s2", "ACG"), 1, -1, -1)
+    assert row["score"] == 2
+    assert row["length"] == 4
+    assert row["matches"] == 3
+    assert row["gaps"] == 1
+    assert format_summary_row(row) == "s1\ts2\t2\t4\t3\t75.00\t1"
+
+
+def test_run_batch_pool_matches_serial():
+    recs1, recs2 = _records()
+    pairs = list(cross_pairs(recs1, recs2))
+    serial = list(run_batch(pairs, 1, -1, -2, workers=1))
+    pooled = list(run_batch(iter(pairs), 1, -1, -2, workers=2, chunksize=1))
+    assert pooled == serial
+    assert [(row["id1"], row["id2"]) for row in serial] == [
+        (s1.id, s2.id) for s1, s2 in pairs
+    ]
+
+
+def test_all_vs_all_symmetric_and_pooled():
+    recs1, recs2 = _records()
+    records = recs1 + recs2
+    scores, identity = all_vs_all(records, 1, -1, -2, workers=1)
+    assert scores.shape == (4, 4)
+    assert np.array_equal(scores, scores.T)
+    assert scores[0, 0] == 7
+    assert scores[1, 3] == align_summary(records[1], records[3], 1, -1, -2)["score"]
+    assert np.allclose(np.diag(identity_distances(identity)), 0.0)
+
+    pooled_scores, pooled_identity = all_vs_all(
+        records, 1, -1, -2, workers=2, chunksize=1
+    )
+    assert np.array_equal(pooled_scores, scores)
+    assert np.array_equal(pooled_identity, identity)
+
+
+def test_search_keeps_top_scores_in_order():
+    query = Sequence("q", "GATTACA")
+    database = [
+        Sequence("d1", "GATTACA"),
+        Sequence("d2", "CCCC"),
+        Sequence("d3", "GATTTACA"),
+        Sequence("d4", "GATTACA"),
+        Sequence("d5", "GAT"),
+    ]
+    rows = search(query, iter(database), 1, -1, -2, top=3, workers=1)
+    assert [row["id2"] for row in rows] == ["d1", "d4", "d3"]
+    assert [row["score"] for row in rows] == [
+        score_only(query, database[i], 1, -1, -2) for i in (0, 3, 2)
+    ]
+    pooled = search(query, iter(database), 1, -1, -2, top=3, workers=2, chunksize=1)
+    assert pooled == rows
+    assert len(search(query, iter(database), 1, -1, -2, top=10, workers=1)) == 5
+
+
+def test_run_batch_min_score_rejects():
+    recs1, recs2 = _records()
+    pairs = list(cross_pairs(recs1, recs2))
+    rows = list(run_batch(pairs, 1, -1, -2, workers=1, min_score=0))
+    full = list(run_batch(pairs, 1, -1, -2, workers=1))
+    for row, ref in zip(rows, full):
+        assert row["rejected"] == (ref["score"] < 0)
+        if row["rejected"]:
+            assert row["score"] is None
+            assert format_summary_row(row).split("\t")[2:4] == ["rejected", "-"]
+        else:
+            assert row["score"] == ref["score"]
+
+
+def test_upper_cells_are_generated_lazily():
+    cells = _upper_cells(10**9)
+    assert next(cells) == (0, 0)
+    assert list(_upper_cells(3)) == [(0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2)]
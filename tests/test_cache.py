@@ -0,0 +1,53 @@
+import os
+import numpy as np
+from src.aligner.cache import AlignmentCache
+from src.aligner.models import Sequence
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = AlignmentCache(str(tmp_path / "cache"))
+    s1, s2 = Sequence("a", "ACGT"), Sequence("b", "AGT")
+    key = cache.key(s1, s2, match=1, mismatch=-1, gap=-2, mode="full")
+    assert cache.get(key) is None
+    matrix = np.arange(20).reshape(5, 4)
+    cache.put(key, {"alignment": ["ACGT", "A-GT"], "score": 1}, matrix=matrix)
+    entry = cache.get(key)
+    assert entry["record"] == {"alignment": ["ACGT", "A-GT"], "score": 1}
+    assert entry["matrix"].tolist() == matrix.tolist()
+    assert "directions" not in entry
+
+
+def test_cache_key_depends_on_content_and_parameters():
+    s1, s2 = Sequence("a", "ACG"), Sequence("b", "T")
+    key = AlignmentCache.key(s1, s2, gap=-2, mode="full")
+    assert key == AlignmentCache.key(Sequence("x", "acg"), s2, gap=-2, mode="full")
+    assert key != AlignmentCache.key(Sequence("x", "AC"), Sequence("y", "GT"))
+    assert key != AlignmentCache.key(s1, s2, gap=-3, mode="full")
+    assert key != AlignmentCache.key(s1, s2, gap=-2, mode="banded")
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = AlignmentCache(str(tmp_path))
+    cache.put("old", {}, matrix=np.zeros(100))
+    cache.max_bytes = (tmp_path / "old.npz").stat().st_size * 3 // 2
+    os.utime(tmp_path / "old.npz", (0, 0))
+    cache.put("new", {}, matrix=np.zeros(100))
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+def test_cache_treats_corrupt_entry_as_miss(tmp_path):
+    cache = AlignmentCache(str(tmp_path))
+    cache.put("key", {"score": 1}, matrix=np.zeros(10))
+    path = tmp_path / "key.npz"
+    path.write_bytes(path.read_bytes()[:20])
+    assert cache.get("key") is None
+    assert not path.exists()
+
+
+def test_cache_skips_arrays_larger_than_bound(tmp_path):
+    cache = AlignmentCache(str(tmp_path), max_bytes=4096)
+    cache.put("key", {"score": 1}, matrix=np.zeros((100, 100), dtype=np.int64))
+    entry = cache.get("key")
+    assert entry["record"] == {"score": 1}
+    assert "matrix" not in entry
@@ -1,6 +1,8 @@
 import pytest
+import shutil
 import sys
 import json
+import numpy as np
 import aligner.cli as cli
 from pathlib import Path
 from src.aligner.cli import parse_args
@@ -29,6 +31,35 @@ def test_parse_args_input():
     assert args.plot is None
 
 
+def test_parse_args_engine():
+    args = parse_args(["--manual", "--engine", "numpy", "--timing"])
+    assert args.engine == "numpy"
+    assert args.timing
+    assert parse_args(["--manual"]).engine == "python"
+
+
+def test_parse_args_hirschberg_rejects_matrix_outputs():
+    with pytest.raises(SystemExit):
+        parse_args(["--manual", "--mode", "hirschberg", "--matrix-out", "m.csv"])
+
+
+def test_parse_args_score_only_rejects_multi_pair_modes():
+    for mode in (
+        ["--input", "a.fa", "b.fa", "--batch"],
+        ["--all-vs-all", "a.fa"],
+        ["--search", "q.fa", "db.fa"],
+    ):
+        with pytest.raises(SystemExit):
+            parse_args(mode + ["--score-only"])
+
+
+def test_parse_args_affine_requires_both_penalties():
+    args = parse_args(["--manual", "--gap-open", "-4", "--gap-extend", "-1"])
+    assert (args.gap_open, args.gap_extend) == (-4, -1)
+    with pytest.raises(SystemExit):
+        parse_args(["--manual", "--gap-open", "-4"])
+
+
 def test_parse_args_manual():
     args = parse_args(["--manual"])
     assert args.manual
@@ -158,3 +189,291 @@ def test_cli_pdf_output(tmp_path, monkeypatch):
 
     cli.main()
     assert out_pdf.exists() and out_pdf.stat().st_size > 0
+
+
+def test_cli_hirschberg_mode(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "s1.fasta").write_text(">s1\nGATTACA\n")
+    (data / "s2.fasta").write_text(">s2\nGCATGCA\n")
+    monkeypatch.chdir(tmp_path)
+
+    out_txt = tmp_path / "report.txt"
+    sys.argv = [
+        "aligner.cli",
+        "--input",
+        "data/s1.fasta",
+        "data/s2.fasta",
+        "--mode",
+        "hirschberg",
+        "--output",
+        str(out_txt),
+    ]
+
+    cli.main()
+
+    assert "Alignment length:" in out_txt.read_text()
+
+
+def test_cli_score_only(tmp_path, monkeypatch, capsys):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "s1.fasta").write_text(">s1\nACGT\n")
+    (data / "s2.fasta").write_text(">s2\nACT\n")
+    monkeypatch.chdir(tmp_path)
+
+    sys.argv = [
+        "aligner.cli",
+        "--input",
+        "data/s1.fasta",
+        "data/s2.fasta",
+        "--score-only",
+    ]
+
+    cli.main()
+
+    assert capsys.readouterr().out.strip() == "Score: 1"
+
+    sys.argv += ["--min-score", "2"]
+    cli.main()
+    assert "rejected" in capsys.readouterr().out
+
+
+def test_cli_all_paths_sample(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "s1.fasta").write_text(">s1\nAAAA\n")
+    (data / "s2.fasta").write_text(">s2\nAA\n")
+    monkeypatch.chdir(tmp_path)
+
+    out_txt = tmp_path / "paths.txt"
+    sys.argv = [
+        "aligner.cli",
+        "--input",
+        "data/s1.fasta",
+        "data/s2.fasta",
+        "--all-paths",
+        "--sample",
+        "3",
+        "--seed",
+        "1",
+        "--output",
+        str(out_txt),
+    ]
+
+    cli.main()
+
+    text = out_txt.read_text()
+    assert "Optimal alignments: 6 (showing 3)" in text
+    assert "Path 3:" in text and "Path 4:" not in text
+
+
+def test_cli_batch(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.fasta").write_text(">a1\nGATTACA\n>a2\nACGT\n")
+    (data / "b.fasta").write_text(">b1\nGCATGCA\n>b2\nACG\n")
+    monkeypatch.chdir(tmp_path)
+
+    out_tsv = tmp_path / "summary.tsv"
+    sys.argv = [
+        "aligner.cli",
+        "--input",
+        "data/a.fasta",
+        "data/b.fasta",
+        "--batch",
+        "--workers",
+        "1",
+        "--output",
+        str(out_tsv),
+    ]
+
+    cli.main()
+
+    lines = out_tsv.read_text().splitlines()
+    assert lines[0].split("\t")[:3] == ["id1", "id2", "score"]
+    assert [line.split("\t")[:2] for line in lines[1:]] == [
+        ["a1", "b1"],
+        ["a1", "b2"],
+        ["a2", "b1"],
+        ["a2", "b2"],
+    ]
+
+
+def test_cli_substitution_matrix(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "s1.fasta").write_text(">s1\nHEAGAWGHEE\n")
+    (data / "s2.fasta").write_text(">s2\nPAWHEAE\n")
+    monkeypatch.chdir(tmp_path)
+
+    out_txt = tmp_path / "report.txt"
+    sys.argv = [
+        "aligner.cli",
+        "--input",
+        "data/s1.fasta",
+        "data/s2.fasta",
+        "--alphabet",
+        "protein",
+        "--substitution-matrix",
+        "BLOSUM62",
+        "--gap",
+        "-8",
+        "--output",
+        str(out_txt),
+    ]
+
+    cli.main()
+
+    report = out_txt.read_text()
+    assert "Substitution matrix: BLOSUM62" in report
+    assert "Match score" not in report
+
+
+def test_cli_batch_jsonl(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.fasta").write_text(">a1\nGATTACA\n>a2\nACGT\n")
+    (data / "b.fasta").write_text(">b1\nGCATGCA\n")
+    monkeypatch.chdir(tmp_path)
+
+    out_jsonl = tmp_path / "summary.jsonl"
+    sys.argv = [
+        "aligner.cli",
+        "--input",
+        "data/a.fasta",
+        "data/b.fasta",
+        "--batch",
+        "--workers",
+        "1",
+        "--output",
+        str(out_jsonl),
+    ]
+
+    cli.main()
+
+    rows = [json.loads(line) for line in out_jsonl.read_text().splitlines()]
+    assert [(row["id1"], row["id2"]) for row in rows] == [("a1", "b1"), ("a2", "b1")]
+
+
+def test_cli_jsonl_records_carry_the_score(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "s1.fasta").write_text(">s1\nGATTACA\n")
+    (data / "s2.fasta").write_text(">s2\nGCATGCA\n")
+    monkeypatch.chdir(tmp_path)
+
+    out_jsonl = tmp_path / "paths.jsonl"
+    sys.argv = ["aligner.cli", "--input", "data/s1.fasta", "data/s2.fasta"]
+    sys.argv += ["--all-paths", "--json", str(out_jsonl)]
+    cli.main()
+
+    rows = [json.loads(line) for line in out_jsonl.read_text().splitlines()]
+    assert rows
+    for row in rows:
+        assert (row["id1"], row["id2"], row["score"]) == ("s1", "s2", 1)
+
+
+def test_cli_search(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "q.fasta").write_text(">q\nGATTACA\n")
+    (data / "db.fasta").write_text(">d1\nCCCC\n>d2\nGATTACA\n>d3\nGATACA\n")
+    monkeypatch.chdir(tmp_path)
+
+    out_tsv = tmp_path / "hits.tsv"
+    sys.argv = [
+        "aligner.cli",
+        "--search",
+        "data/q.fasta",
+        "data/db.fasta",
+        "--top",
+        "2",
+        "--workers",
+        "1",
+        "--output",
+        str(out_tsv),
+    ]
+
+    cli.main()
+
+    lines = out_tsv.read_text().splitlines()
+    assert lines[0].split("\t")[:3] == ["id1", "id2", "score"]
+    assert [line.split("\t")[:3] for line in lines[1:]] == [
+        ["q", "d2", "7"],
+        ["q", "d3", "4"],
+    ]
+
+
+def test_cli_cache_stores_matrix_only_when_needed(tmp_path, monkeypatch, capsys):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "s1.fasta").write_text(">s1\nGATTACA\n")
+    (data / "s2.fasta").write_text(">s2\nGCATGCA\n")
+    monkeypatch.chdir(tmp_path)
+    base = ["aligner.cli", "--input", "data/s1.fasta", "data/s2.fasta"]
+    base += ["--cache-dir", "cache"]
+
+    sys.argv = base
+    cli.main()
+    first = capsys.readouterr().out
+    (entry,) = (tmp_path / "cache").iterdir()
+    with np.load(entry) as archive:
+        assert "matrix" not in archive.files
+    cli.main()
+    assert capsys.readouterr().out == first
+
+    # a run that needs the matrix refills it and caches it with the entry
+    sys.argv = base + ["--matrix-out", "m.npy"]
+    cli.main()
+    with np.load(entry) as archive:
+        assert "matrix" in archive.files
+    assert np.load(tmp_path / "m.npy").shape == (8, 8)
+
+
+def test_cli_cache_all_paths_entry_without_arrays(tmp_path, monkeypatch, capsys):
+    rng = np.random.default_rng(0)
+    data = tmp_path / "data"
+    data.mkdir()
+    for name in ("s1", "s2"):
+        residues = "".join(rng.choice(list("ACGT"), 450))
+        (data / f"{name}.fasta").write_text(f">{name}\n{residues}\n")
+    monkeypatch.chdir(tmp_path)
+    base = ["aligner.cli", "--input", "data/s1.fasta", "data/s2.fasta"]
+    base += ["--cache-dir", "cache", "--cache-size", "1"]
+
+    # the matrix exceeds the 1 MB bound, so only the record is stored
+    sys.argv = base + ["--all-paths", "--max-paths", "1"]
+    cli.main()
+    (entry,) = (tmp_path / "cache").iterdir()
+    with np.load(entry) as archive:
+        assert archive.files == ["record"]
+    capsys.readouterr()
+
+    sys.argv = base
+    cli.main()
+    cached = capsys.readouterr().out
+    shutil.rmtree(tmp_path / "cache")
+    cli.main()
+    assert capsys.readouterr().out == cached
+
+
+def test_cli_timing_score_only_and_cache_hit(tmp_path, monkeypatch, capsys):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "s1.fasta").write_text(">s1\nGATTACA\n")
+    (data / "s2.fasta").write_text(">s2\nGCATGCA\n")
+    monkeypatch.chdir(tmp_path)
+    base = ["aligner.cli", "--input", "data/s1.fasta", "data/s2.fasta", "--timing"]
+
+    sys.argv = base + ["--score-only"]
+    cli.main()
+    assert "Fill (score-only): 49 cells" in capsys.readouterr().err
+
+    sys.argv = base + ["--cache-dir", "cache"]
+    cli.main()
+    assert "MCUPS" in capsys.readouterr().err
+    cli.main()
+    err = capsys.readouterr().err
+    assert "Fill (cache): lookup in" in err
+    assert "MCUPS" not in err
@@ -1,6 +1,46 @@
+import random
 import pytest
 from src.aligner.models import Sequence
-from src.aligner.core import build_score_matrix, trace_all_paths, traceback
+from src.aligner.scoring import SubstitutionMatrix
+from src.aligner.core import (
+    DIAG,
+    IncrementalAligner,
+    QueryProfile,
+    LEFT,
+    UP,
+    affine_traceback,
+    alignment_result,
+    banded_align,
+    build_affine_matrices,
+    build_direction_matrix,
+    build_score_matrix,
+    count_optimal_paths,
+    edit_distance,
+    hirschberg,
+    iter_optimal_paths,
+    optimal_path_counts,
+    sample_optimal_paths,
+    score_only,
+    trace_all_paths,
+    traceback,
+    unit_cost,
+)
+
+
+def _score(aln1, aln2, match, mismatch, gap):
+    total = 0
+    for a, b in zip(aln1, aln2):
+        if a == "-" or b == "-":
+            total += gap
+        else:
+            total += match if a == b else mismatch
+    return total
+
+
+def _random_pair(rng, max_len=15, alphabet="ACGT"):
+    s1 = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len)))
+    s2 = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len)))
+    return Sequence("s1", s1), Sequence("s2", s2)
 
 
 def test_build_score_matrix_single_match():
@@ -53,3 +93,297 @@ def test_trace_all_paths_gap_variants():
     paths = trace_all_paths(mat, s1, s2, match=1, mismatch=-1, gap=-1)
     expected = {("AG", "A-")}
     assert set(paths) == expected
+
+
+def test_numpy_engine_matches_python_engine():
+    rng = random.Random(0)
+    for _ in range(50):
+        s1 = Sequence(
+            "s1", "".join(rng.choice("ACGT") for _ in range(rng.randint(0, 15)))
+        )
+        s2 = Sequence(
+            "s2", "".join(rng.choice("ACGT") for _ in range(rng.randint(0, 15)))
+        )
+        expected = build_score_matrix(s1, s2, match=2, mismatch=-1, gap=-2)
+        mat = build_score_matrix(s1, s2, match=2, mismatch=-1, gap=-2, engine="numpy")
+        assert mat.tolist() == expected
+
+
+def test_build_score_matrix_unknown_engine():
+    s1 = Sequence("s1", "A")
+    with pytest.raises(ValueError):
+        build_score_matrix(s1, s1, match=1, mismatch=-1, gap=-1, engine="gpu")
+
+
+def test_hirschberg_is_optimal(monkeypatch):
+    import src.aligner.core as core
+
+    # force the divide-and-conquer path even on tiny inputs
+    monkeypatch.setattr(core, "_HIRSCHBERG_BASE_CELLS", 0)
+    rng = random.Random(1)
+    for _ in range(100):
+        s1, s2 = _random_pair(rng, max_len=20)
+        aln1, aln2 = hirschberg(s1, s2, match=1, mismatch=-1, gap=-2)
+        assert aln1.replace("-", "") == s1.sequence
+        assert aln2.replace("-", "") == s2.sequence
+        mat = build_score_matrix(s1, s2, match=1, mismatch=-1, gap=-2)
+        assert _score(aln1, aln2, 1, -1, -2) == mat[-1][-1]
+
+
+def test_hirschberg_single_match():
+    s1 = Sequence("s1", "A")
+    assert hirschberg(s1, s1, match=1, mismatch=-1, gap=-1) == ("A", "A")
+
+
+def test_score_only_matches_matrix():
+    rng = random.Random(2)
+    for _ in range(50):
+        s1, s2 = _random_pair(rng)
+        mat = build_score_matrix(s1, s2, match=2, mismatch=-1, gap=-2)
+        assert score_only(s1, s2, match=2, mismatch=-1, gap=-2) == mat[-1][-1]
+
+
+@pytest.mark.parametrize("band", [0, 1, 4])
+def test_banded_align_is_optimal(band):
+    rng = random.Random(3)
+    for _ in range(100):
+        s1, s2 = _random_pair(rng, max_len=20)
+        aln1, aln2 = banded_align(s1, s2, match=1, mismatch=-1, gap=-1, band=band)
+        assert aln1.replace("-", "") == s1.sequence
+        assert aln2.replace("-", "") == s2.sequence
+        mat = build_score_matrix(s1, s2, match=1, mismatch=-1, gap=-1)
+        assert _score(aln1, aln2, 1, -1, -1) == mat[-1][-1]
+
+
+def test_banded_align_length_difference():
+    s1 = Sequence("s1", "ACGTACGTAC")
+    s2 = Sequence("s2", "AC")
+    aln1, aln2 = banded_align(s1, s2, match=1, mismatch=-1, gap=-2, band=0)
+    assert aln1 == "ACGTACGTAC"
+    assert aln2.replace("-", "") == "AC"
+
+
+def test_direction_matrix_flags():
+    s1 = Sequence("s1", "AG")
+    s2 = Sequence("s2", "A")
+    dirs = build_direction_matrix(s1, s2, match=1, mismatch=-1, gap=-1)
+    assert dirs.dtype.name == "uint8"
+    assert dirs.shape == (3, 2)
+    assert dirs[1, 1] == DIAG
+    assert dirs[2, 1] == UP
+    assert dirs[0, 1] == LEFT
+
+
+def test_traceback_from_directions_matches_matrix():
+    rng = random.Random(4)
+    for _ in range(50):
+        s1, s2 = _random_pair(rng)
+        mat = build_score_matrix(s1, s2, match=1, mismatch=-1, gap=-1)
+        dirs = build_direction_matrix(s1, s2, match=1, mismatch=-1, gap=-1)
+        expected = traceback(mat, s1, s2, match=1, mismatch=-1, gap=-1)
+        assert traceback(None, s1, s2, 1, -1, -1, directions=dirs) == expected
+        expected_paths = trace_all_paths(mat, s1, s2, 1, -1, -1, max_paths=20)
+        paths = trace_all_paths(None, s1, s2, 1, -1, -1, max_paths=20, directions=dirs)
+        assert paths == expected_paths
+
+
+def test_trace_all_paths_long_sequence_is_iterative():
+    s1 = Sequence("s1", "A" * 3000)
+    mat = build_score_matrix(s1, s1, match=0, mismatch=0, gap=0, engine="numpy")
+    paths = trace_all_paths(mat, s1, s1, match=0, mismatch=0, gap=0, max_paths=3)
+    assert len(paths) == 3
+    assert paths[0] == ("A" * 3000, "A" * 3000)
+
+
+def test_count_optimal_paths():
+    s1 = Sequence("s1", "GA")
+    s2 = Sequence("s2", "AG")
+    mat = build_score_matrix(s1, s2, match=1, mismatch=-1, gap=-1)
+    paths = trace_all_paths(mat, s1, s2, match=1, mismatch=-1, gap=-1)
+    assert count_optimal_paths(mat, s1, s2, 1, -1, -1) == len(paths)
+
+    s3 = Sequence("s3", "A" * 40)
+    s4 = Sequence("s4", "A" * 20)
+    mat = build_score_matrix(s3, s4, match=1, mismatch=-1, gap=-1)
+    # choose which 20 of the 40 bases are matched: C(40, 20)
+    assert count_optimal_paths(mat, s3, s4, 1, -1, -1) == 137846528820
+
+
+def test_iter_optimal_paths_is_lazy_and_ordered():
+    s1 = Sequence("s1", "AAAA")
+    s2 = Sequence("s2", "AA")
+    mat = build_score_matrix(s1, s2, match=1, mismatch=-1, gap=-1)
+    it = iter_optimal_paths(mat, s1, s2, match=1, mismatch=-1, gap=-1)
+    assert next(it) == trace_all_paths(mat, s1, s2, 1, -1, -1, max_paths=1)[0]
+    assert [next(it)] + list(it) == trace_all_paths(mat, s1, s2, 1, -1, -1)[1:]
+
+
+def test_sample_optimal_paths_uniform():
+    s1 = Sequence("s1", "AAAA")
+    s2 = Sequence("s2", "AA")
+    mat = build_score_matrix(s1, s2, match=1, mismatch=-1, gap=-1)
+    every = set(trace_all_paths(mat, s1, s2, match=1, mismatch=-1, gap=-1))
+    samples = sample_optimal_paths(mat, s1, s2, 1, -1, -1, k=3000, seed=7)
+    assert len(samples) == 3000
+    assert set(samples) == every
+    counts = [samples.count(path) for path in every]
+    assert min(counts) > 400 and max(counts) < 600
+    again = sample_optimal_paths(mat, s1, s2, 1, -1, -1, k=3000, seed=7)
+    assert again == samples
+    counts = optimal_path_counts(mat, s1, s2, 1, -1, -1)
+    assert counts[-1][-1] == count_optimal_paths(mat, s1, s2, 1, -1, -1)
+    shared = sample_optimal_paths(mat, s1, s2, 1, -1, -1, 3000, 7, counts=counts)
+    assert shared == samples
+
+
+def _affine_score(aln1, aln2, match, mismatch, gap_open, gap_extend):
+    total, previous = 0, None
+    for a, b in zip(aln1, aln2):
+        kind = "x" if b == "-" else "y" if a == "-" else None
+        if kind is None:
+            total += match if a == b else mismatch
+        else:
+            total += gap_extend if kind == previous else gap_open
+        previous = kind
+    return total
+
+
+def test_affine_with_equal_penalties_matches_linear():
+    rng = random.Random(5)
+    for _ in range(50):
+        s1, s2 = _random_pair(rng)
+        mats = build_affine_matrices(s1, s2, 1, -1, -2, -2)
+        linear = build_score_matrix(s1, s2, match=1, mismatch=-1, gap=-2)
+        assert max(int(mat[-1, -1]) for mat in mats) == linear[-1][-1]
+
+
+def test_affine_traceback_prefers_one_long_gap():
+    s1 = Sequence("s1", "ACGTTTTACG")
+    s2 = Sequence("s2", "ACGACG")
+    mats = build_affine_matrices(s1, s2, 2, -1, -5, -1)
+    aln1, aln2 = affine_traceback(mats, s1, s2, 2, -1, -5, -1)
+    assert aln1 == "ACGTTTTACG"
+    assert aln2.replace("-", "") == "ACGACG"
+    assert aln2.count("-") == 4 and "----" in aln2
+    best = max(int(mat[-1, -1]) for mat in mats)
+    assert _affine_score(aln1, aln2, 2, -1, -5, -1) == best == 12 - 5 - 3
+
+
+def test_affine_traceback_is_optimal():
+    rng = random.Random(6)
+    for _ in range(100):
+        s1, s2 = _random_pair(rng)
+        mats = build_affine_matrices(s1, s2, 2, -1, -4, -1)
+        aln1, aln2 = affine_traceback(mats, s1, s2, 2, -1, -4, -1)
+        assert aln1.replace("-", "") == s1.sequence
+        assert aln2.replace("-", "") == s2.sequence
+        best = max(int(mat[-1, -1]) for mat in mats)
+        assert _affine_score(aln1, aln2, 2, -1, -4, -1) == best
+
+
+def test_incremental_aligner_matches_full_fill():
+    rng = random.Random(19)
+    rand = lambda k: "".join(rng.choice("ACGT") for _ in range(k))
+    s1, s2 = rand(15), rand(12)
+    inc = IncrementalAligner(Sequence("a", s1), Sequence("b", s2), 2, -1, -2)
+    for _ in range(30):
+        if rng.random() < 0.5:
+            x, y = rand(rng.randint(0, 4)), rand(rng.randint(0, 4))
+            inc.extend(x, y)
+            s1, s2 = s1 + x, s2 + y
+        else:
+            p = rng.randint(0, len(s1))
+            s1 = s1[:p] + rand(rng.randint(0, 3)) + s1[p + rng.randint(0, 3) :]
+            inc.update(seq1=Sequence("a", s1))
+        seq1, seq2 = Sequence("a", s1), Sequence("b", s2)
+        matrix = build_score_matrix(seq1, seq2, 2, -1, -2)
+        assert inc.matrix.tolist() == matrix
+        assert inc.traceback() == traceback(matrix, seq1, seq2, 2, -1, -2)
+
+
+def test_incremental_aligner_cost_follows_the_change():
+    ref = Sequence("ref", "ACGT" * 50)
+    inc = IncrementalAligner(Sequence("c", "ACGT" * 40), ref, 1, -1, -1)
+    assert inc.extend("ACGT") == 4 * 200
+    assert inc.score == 164 - 36
+    edited = "ACGT" * 40 + "ACTT"
+    assert inc.update(seq1=Sequence("c", edited)) == 2 * 200
+
+
+def test_query_profile_matches_score_only():
+    rng = random.Random(21)
+    rand = lambda k: "".join(rng.choice("ACGT") for _ in range(k))
+    query = Sequence("q", rand(12))
+    targets = [Sequence(f"t{k}", rand(rng.randint(0, 20))) for k in range(15)]
+    profile = QueryProfile(query, 2, -1, -3)
+    assert profile.score_many(targets) == [
+        score_only(query, target, 2, -1, -3) for target in targets
+    ]
+    assert profile.score(targets[0]) == score_only(query, targets[0], 2, -1, -3)
+    assert QueryProfile(Sequence("e", ""), 1, -1, -2).score(query) == -24
+
+
+def test_unit_cost_detection():
+    assert unit_cost(0, -1, -1) == 1
+    assert unit_cost(2, -1, -2) == 3
+    assert unit_cost(1, -1, -1) is None
+    assert unit_cost(0, -1, -1, substitution=SubstitutionMatrix.uniform(2, -1)) is None
+
+
+def test_edit_distance_and_unit_cost_routes():
+    assert edit_distance(Sequence("a", "GATTACA"), Sequence("b", "GCATGCT")) == 4
+    rng = random.Random(22)
+    rand = lambda k: "".join(rng.choice("ACGT") for _ in range(k))
+    for _ in range(30):
+        seq1, seq2 = Sequence("a", rand(rng.randint(0, 80))), Sequence("b", rand(40))
+        for params in ((0, -1, -1), (2, -1, -2)):
+            matrix = build_score_matrix(seq1, seq2, *params)
+            assert score_only(seq1, seq2, *params) == matrix[-1][-1]
+            aln = banded_align(seq1, seq2, *params, band=0)
+            assert _score(*aln, *params) == matrix[-1][-1]
+
+
+def test_score_only_min_score_cutoff():
+    rng = random.Random(23)
+    rand = lambda k: "".join(rng.choice("ACGT") for _ in range(k))
+    for _ in range(50):
+        seq1, seq2 = Sequence("a", rand(rng.randint(0, 25))), Sequence("b", rand(20))
+        score = score_only(seq1, seq2, 1, -1, -2)
+        assert score_only(seq1, seq2, 1, -1, -2, min_score=score) == score
+        assert score_only(seq1, seq2, 1, -1, -2, min_score=score + 1) is None
+    # unrelated sequences are rejected long before the last row
+    seq1, seq2 = Sequence("a", "A" * 200), Sequence("b", "C" * 200)
+    assert score_only(seq1, seq2, 1, -1, -2, min_score=100) is None
+
+
+def test_alignment_result_scores_affine_gaps():
+    result = alignment_result("AC--GT", "ACTTGT", 1, -1, -4, gap_extend=-1)
+    assert result.score == 4 - 4 - 1
+    assert result.gaps == 2
+    linear = alignment_result("AC--GT", "ACTTGT", 1, -1, -2)
+    assert linear.score == 4 - 4
+    assert alignment_result("A", "A", 1, -1, -2, score=7).score == 7
+
+
+def test_incremental_aligner_grows_only_the_extended_axis():
+    inc = IncrementalAligner(
+        Sequence("c", "ACGT"), Sequence("r", "ACGT" * 25), 1, -1, -1
+    )
+    cols = inc._cells.shape[1]
+    for _ in range(10):
+        inc.extend("ACGT" * 10)
+    assert inc._cells.shape[1] == cols
+    assert inc._cells.shape[0] >= 405
+    assert inc.score == score_only(inc.seq1, inc.seq2, 1, -1, -1)
+
+
+def test_direction_matrix_min_score_cutoff():
+    seq1, seq2 = Sequence("a", "GATTACA"), Sequence("b", "GCATGCA")
+    full = build_direction_matrix(seq1, seq2, 1, -1, -2)
+    score = score_only(seq1, seq2, 1, -1, -2)
+    kept = build_direction_matrix(seq1, seq2, 1, -1, -2, min_score=score)
+    assert (kept == full).all()
+    assert build_direction_matrix(seq1, seq2, 1, -1, -2, min_score=score + 1) is None
+    assert (
+        build_direction_matrix(Sequence("e", ""), seq2, 1, -1, -2, min_score=0) is None
+    )
@@ -1,15 +1,26 @@
+import gzip
 import pytest
 import json
-from aligner.models import Sequence
+import numpy as np
+from aligner.models import AlignmentResult, Sequence
 from src.aligner.io import (
+    fetch_record,
+    index_fasta,
+    load_fasta_index,
+    parse_region,
     format_multi_report,
     format_report,
+    iter_fasta,
+    iter_multi_report,
+    write_distance_matrix,
     write_matrix,
     write_report,
+    write_report_lines,
     read_fasta,
     read_manual,
     create_output_dict,
     write_json,
+    write_jsonl,
 )
 from src.aligner.models import Sequence
 
@@ -85,9 +96,9 @@ def test_read_manual_invalid(monkeypatch):
 def test_write_report_and_format(tmp_path):
     seq1 = Sequence("s1", "A")
     seq2 = Sequence("s2", "A")
-    aligned1, aligned2 = "A", "A"
+    alignment = AlignmentResult("A", "A", score=1)
     match, mismatch, gap = 1, -1, -1
-    report = format_report(seq1, seq2, aligned1, aligned2, match, mismatch, gap)
+    report = format_report(seq1, seq2, alignment, match, mismatch, gap)
     assert "Match score: 1" in report
     assert "Mismatch score: -1" in report
     assert "Gap penalty: -1" in report
@@ -95,6 +106,10 @@ def test_write_report_and_format(tmp_path):
     assert "s2: A" in report
     assert "Alignment length: 1" in report
     assert "Identical positions: 1" in report
+    assert "Score: 1" in report
+    affine = format_report(seq1, seq2, ("A", "A"), 1, -1, -4, gap_extend=-1)
+    assert "Gap open penalty: -4" in affine
+    assert "Gap extend penalty: -1" in affine
     out_file = tmp_path / "report.txt"
     write_report(str(out_file), report)
     assert out_file.read_text() == report
@@ -128,12 +143,52 @@ def test_format_multi_report(tmp_path):
     assert "Identical positions: 0 (0.00%)" in report
     assert "Total gaps: 0" in report
 
+    assert "Optimal alignments" not in report
+    report = format_multi_report(
+        seq1, seq2, alignments, match=1, mismatch=-1, gap=-1, total=5
+    )
+    assert "Optimal alignments: 5 (showing 2)" in report
+
     out_file = tmp_path / "multi_report.txt"
     write_report(str(out_file), report)
     text = out_file.read_text()
     assert "Path 1:" in text and "Path 2:" in text
 
 
+def test_iter_multi_report_streams(tmp_path):
+    seq1 = Sequence("s1", "GA")
+    seq2 = Sequence("s2", "AG")
+    alignments = [("GA", "AG"), ("-GA", "GA-")]
+    expected = format_multi_report(seq1, seq2, alignments, 1, -1, -1, total=2)
+    lines = iter_multi_report(seq1, seq2, iter(alignments), 1, -1, -1, total=2, shown=2)
+    out_file = tmp_path / "streamed.txt"
+    write_report_lines(str(out_file), lines)
+    assert out_file.read_text() == expected
+
+
+def test_write_distance_matrix(tmp_path):
+    distances = [[0.0, 0.25], [0.25, 0.0]]
+    out_file = tmp_path / "dist.phy"
+    write_distance_matrix(str(out_file), ["a", "b"], distances)
+    assert out_file.read_text().splitlines() == [
+        "2",
+        "a          0.0000 0.2500",
+        "b          0.2500 0.0000",
+    ]
+
+    out_npy = tmp_path / "dist.npy"
+    write_distance_matrix(str(out_npy), ["a", "b"], distances)
+    assert np.load(out_npy).tolist() == distances
+
+    # names are the first word of the header, so every row splits cleanly
+    write_distance_matrix(str(out_file), ["r0 desc", "long_record_name x"], distances)
+    rows = [line.split() for line in out_file.read_text().splitlines()[1:]]
+    assert rows == [
+        ["r0", "0.0000", "0.2500"],
+        ["long_record_name", "0.2500", "0.0000"],
+    ]
+
+
 def test_write_matrix(tmp_path):
     matrix = [
         [0, -1, -2],
@@ -170,3 +225,86 @@ def test_create_output_dict_and_write_json(tmp_path):
     write_json(str(out), data)
     loaded = json.loads(out.read_text())
     assert loaded == data
+
+
+def test_iter_fasta_streams_records(tmp_path):
+    path = tmp_path / "multi.fasta"
+    path.write_text("\n>s1 first\nAC\ngt\n\n>s2\r\nTT\r\nTT\r\n")
+    records = iter_fasta(str(path))
+    first = next(records)
+    assert (first.id, first.sequence) == ("s1 first", "ACGT")
+    assert [(rec.id, rec.sequence) for rec in records] == [("s2", "TTTT")]
+
+
+def test_iter_fasta_reads_gzip(tmp_path):
+    path = tmp_path / "multi.fa.gz"
+    with gzip.open(path, "wt") as f:
+        f.write(">s1\nAAA\n>s2\nCCC\nGGG\n")
+    assert [rec.sequence for rec in iter_fasta(str(path))] == ["AAA", "CCCGGG"]
+
+
+def test_fasta_index_matches_samtools_layout(tmp_path):
+    path = tmp_path / "ref.fa"
+    path.write_text(">chr1 first\nACGTA\nCGTAC\nGT\n>chr2\nTTTT\n")
+    index = index_fasta(str(path))
+    assert (tmp_path / "ref.fa.fai").read_text() == (
+        "chr1\t12\t12\t5\t6\nchr2\t4\t33\t4\t5\n"
+    )
+    assert load_fasta_index(str(path)) == index
+
+
+def test_fetch_record_seeks_to_range(tmp_path):
+    path = tmp_path / "ref.fa"
+    path.write_text(">chr1\nACGTA\nCGTAC\nGT\n>chr2\nTTTT\n")
+    assert fetch_record(str(path), "chr2").sequence == "TTTT"
+    part = fetch_record(str(path), "chr1", 3, 11)
+    assert (part.id, part.sequence) == ("chr1:4-11", "TACGTACG")
+    with pytest.raises(ValueError):
+        fetch_record(str(path), "chr1", 0, 13)
+    assert parse_region(f"{path}:chr1:4-11") == (str(path), "chr1", 3, 11)
+    assert parse_region(str(path)) is None
+
+
+def test_write_json_streams_ndarray_matrix(tmp_path):
+    seq1 = Sequence("s1", "AC")
+    seq2 = Sequence("s2", "A")
+    matrix = np.array([[0, -1], [-1, 1], [-2, -1]])
+    data = create_output_dict(
+        seq1, seq2, matrix, [("AC", "A-")], match=1, mismatch=-1, gap=-1
+    )
+    out = tmp_path / "out.json"
+    write_json(str(out), data)
+    text = out.read_text()
+    assert "\n    [-1, 1],\n" in text
+    assert json.loads(text)["matrix"] == matrix.tolist()
+
+    summary = create_output_dict(
+        seq1, seq2, matrix, [], 1, -1, -1, matrix_mode="summary"
+    )
+    assert summary["matrix"] == {"shape": [3, 2], "min": -2, "max": 1, "score": -1}
+    assert "matrix" not in create_output_dict(
+        seq1, seq2, None, [], 1, -1, -1, matrix_mode="none"
+    )
+
+
+def test_write_jsonl_one_record_per_line(tmp_path):
+    out = tmp_path / "rows.jsonl"
+    write_jsonl(str(out), iter([{"id1": "a", "score": 3}, {"id1": "b", "score": 1}]))
+    lines = out.read_text().splitlines()
+    assert [json.loads(line)["id1"] for line in lines] == ["a", "b"]
+    assert lines[0] == '{"id1":"a","score":3}'
+
+
+@pytest.mark.parametrize("as_array", [False, True])
+def test_write_matrix_binary(tmp_path, as_array):
+    matrix = [[0, -1, -2], [-1, 1, 0]]
+    data = np.array(matrix) if as_array else matrix
+    write_matrix(str(tmp_path / "m.npy"), data)
+    loaded = np.load(tmp_path / "m.npy", mmap_mode="r")
+    assert loaded.dtype == np.int64
+    assert loaded.tolist() == matrix
+    write_matrix(str(tmp_path / "m.npz"), data)
+    with np.load(tmp_path / "m.npz") as archive:
+        assert archive["matrix"].tolist() == matrix
+    write_matrix(str(tmp_path / "m.csv"), data)
+    assert (tmp_path / "m.csv").read_bytes() == b"0,-1,-2\r\n-1,1,0\r\n"
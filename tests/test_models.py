@@ -1,5 +1,5 @@
 import pytest
-from src.aligner.models import Sequence
+from src.aligner.models import AlignmentResult, Sequence
 
 
 def test_valid_dna_sequence():
@@ -28,3 +28,30 @@ def test_invalid_protein_sequence_raises():
 def test_unknown_alphabet_raises():
     with pytest.raises(ValueError):
         Sequence(identifier="foo", sequence="ACGT", alphabet="rna")
+
+
+def test_sequence_from_bytes_is_uppercased():
+    seq = Sequence(identifier="raw", sequence=b"acgTa")
+    assert seq.data == b"ACGTA"
+    assert seq.sequence == "ACGTA"
+
+
+def test_sequence_views_share_storage():
+    seq = Sequence(identifier="seq1", sequence="ACGT")
+    assert bytes(seq.buffer) == b"ACGT"
+    assert seq.codes.tolist() == [65, 67, 71, 84]
+    assert not seq.codes.flags.writeable
+    assert not hasattr(seq, "__dict__")
+
+
+def test_alignment_result_statistics_are_cached():
+    result = AlignmentResult("AC-GT", "ACTG-", score=-1)
+    assert not hasattr(result, "__dict__")
+    assert (result.length, result.matches, result.gaps) == (5, 3, 2)
+    assert result.identity_pct == 60.0
+    assert result._stats is not None
+    aligned1, aligned2 = result
+    assert (aligned1, aligned2) == ("AC-GT", "ACTG-")
+    assert result.as_dict()["matches"] == 3
+    assert result.as_dict()["score"] == -1
+    assert AlignmentResult("", "").identity_pct == 0.0
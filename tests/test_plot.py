@@ -1,5 +1,6 @@
 import os
-from src.aligner.plot import plot_matrix
+import numpy as np
+from src.aligner.plot import _pool, plot_matrix, traceback_path
 
 
 def test_plot_matrix(tmp_path):
@@ -9,3 +10,21 @@ def test_plot_matrix(tmp_path):
     assert fig is not None
     assert os.path.exists(str(out_file))
     assert out_file.stat().st_size > 0
+
+
+def test_pool_matrix_blocks():
+    matrix = np.arange(30).reshape(5, 6)
+    pooled = _pool(matrix, 2, 4, "max")
+    assert pooled.tolist() == [[9, 11], [21, 23], [27, 29]]
+    mean = _pool(matrix.tolist(), 5, 6, "mean")
+    assert mean.tolist() == [[14.5]]
+
+
+def test_plot_matrix_from_npy_with_trace(tmp_path):
+    matrix = np.arange(12).reshape(3, 4)
+    npy = tmp_path / "m.npy"
+    np.save(npy, matrix)
+    out_file = tmp_path / "heatmap.png"
+    plot_matrix(str(npy), str(out_file), alignment=("AC-", "ACG"))
+    assert out_file.stat().st_size > 0
+    assert traceback_path("AC-", "A-G") == ([0, 1, 2, 2], [0, 1, 1, 2])
@@ -0,0 +1,86 @@
+import random
+import pytest
+from src.aligner.models import Sequence
+from src.aligner.core import (
+    alignment_score,
+    banded_align,
+    build_score_matrix,
+    hirschberg,
+    score_only,
+    traceback,
+)
+from src.aligner.scoring import (
+    SubstitutionMatrix,
+    load_substitution_matrix,
+    parse_substitution_matrix,
+)
+
+PROTEIN = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def test_builtin_blosum62_lookup():
+    blosum = load_substitution_matrix("blosum62")
+    assert blosum.name == "BLOSUM62"
+    assert blosum.score("W", "W") == 11
+    assert blosum.score("A", "R") == blosum.score("R", "A") == -1
+    assert blosum.max_score() == 11
+
+
+def test_encode_rejects_unknown_symbols():
+    blosum = load_substitution_matrix("BLOSUM62")
+    assert list(blosum.encode("ARN")) == [0, 1, 2]
+    with pytest.raises(ValueError):
+        blosum.encode("AJ")
+
+
+def test_parse_custom_matrix(tmp_path):
+    path = tmp_path / "dna.txt"
+    path.write_text(
+        "# transitions score 0\n   A  C  G  T\nA  2 -1  0 -1\n"
+        "C -1  2 -1  0\nG  0 -1  2 -1\nT -1  0 -1  2\n"
+    )
+    table = load_substitution_matrix(str(path))
+    assert table.alphabet == "ACGT"
+    assert table.score("A", "G") == 0
+    with pytest.raises(ValueError):
+        parse_substitution_matrix("   A  C\nA  1\nC  0  1\n")
+
+
+def test_uniform_table_matches_match_mismatch():
+    rng = random.Random(3)
+    table = SubstitutionMatrix.uniform(2, -3)
+    for _ in range(20):
+        s1 = Sequence("s1", "".join(rng.choice("ACGT") for _ in range(12)))
+        s2 = Sequence("s2", "".join(rng.choice("ACGT") for _ in range(9)))
+        expected = build_score_matrix(s1, s2, 2, -3, -2)
+        assert build_score_matrix(s1, s2, 0, 0, -2, substitution=table) == expected
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_substitution_alignment_is_optimal(engine):
+    blosum = load_substitution_matrix("BLOSUM62")
+    rng = random.Random(11)
+    for _ in range(30):
+        s1 = Sequence(
+            "s1",
+            "".join(rng.choice(PROTEIN) for _ in range(rng.randint(0, 25))),
+            "protein",
+        )
+        s2 = Sequence(
+            "s2",
+            "".join(rng.choice(PROTEIN) for _ in range(rng.randint(0, 25))),
+            "protein",
+        )
+        mat = build_score_matrix(s1, s2, 0, 0, -6, engine=engine, substitution=blosum)
+        best = int(mat[len(s1)][len(s2)])
+        assert score_only(s1, s2, 0, 0, -6, substitution=blosum) == best
+        alignments = [
+            traceback(mat, s1, s2, 0, 0, -6, substitution=blosum),
+            hirschberg(s1, s2, 0, 0, -6, substitution=blosum),
+            banded_align(s1, s2, 0, 0, -6, band=2, substitution=blosum),
+        ]
+        for aln1, aln2 in alignments:
+            assert aln1.replace("-", "") == s1.sequence
+            assert aln2.replace("-", "") == s2.sequence
+            score = alignment_score(aln1, aln2, 0, 0, -6, substitution=blosum)
+            assert score == best
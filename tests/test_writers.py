@@ -0,0 +1,36 @@
+import subprocess
+import sys
+import pytest
+from src.aligner.writers import get_writer
+
+# Upper bound on the time to import aligner.cli, in microseconds as reported
+# by python -X importtime; without the output backends it is well under it.
+IMPORT_BUDGET_US = 500_000
+
+
+def test_get_writer():
+    assert get_writer("plot").__name__ == "plot_matrix"
+    with pytest.raises(ValueError):
+        get_writer("svg")
+
+
+def test_cli_import_skips_backends_and_fits_budget():
+    code = (
+        "import sys, aligner.cli; "
+        "print(sorted({'matplotlib', 'jinja2', 'reportlab'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+    # stderr lines read "import time: self | cumulative | module"
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if fields[-1] == "aligner.cli":
+            assert int(fields[1]) < IMPORT_BUDGET_US
+            break
+    else:
+        pytest.fail("aligner.cli missing from the import timings")